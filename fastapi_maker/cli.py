@@ -18,16 +18,12 @@ Ejemplo de uso:
         → Crea entidad 'User' con 'name' obligatorio y el resto opcionales.
 """
 
-from fastapi_maker.generators.entity_generator import EntityGenerator
 import typer
 import os
 from pathlib import Path
-from fastapi_maker.generators.migration_manager import MigrationManager
-from fastapi_maker.generators.project_initializer import ProjectInitializer
-from fastapi_maker.generators.relation_manager import RelationManager
-from fastapi_maker.generators.router_update import RouterUpdater
-from fastapi_maker.utils.ruff_executor import RuffExecutor
-from fastapi_maker.generators.audit_manager import AuditManager
+
+# Los generadores se importan dentro de cada comando: así `fam <comando>`
+# solo carga el módulo que va a usar
 
 app = typer.Typer(
     name="fam",
@@ -37,6 +33,8 @@ app = typer.Typer(
 @app.command()
 def init():
     """Inicializa la estructura base del proyecto FastAPI (carpetas, archivos base, etc.)."""
+    from fastapi_maker.generators.project_initializer import ProjectInitializer
+
     initializer = ProjectInitializer()
     initializer.create_project_structure()
 
@@ -52,6 +50,8 @@ def create(nombre: str, campos: list[str] = typer.Argument(None, help="Lista de
         fam create user *name:str email:str
         fam create post *title:str content:text published:bool
     """
+    from fastapi_maker.generators.entity_generator import EntityGenerator
+
     # Si no se pasan campos, usamos el valor por defecto
     if campos is None:
         campos = ["*name:str"]
@@ -64,13 +64,18 @@ def migrate(message: str = typer.Option(None, "-m", "--message", help="Mensaje d
     Ejecuta las migraciones pendientes de Alembic en la base de datos.
     Opcionalmente, permite especificar un mensaje para la nueva migración.
     """
+    from fastapi_maker.generators.migration_manager import MigrationManager
+
     MigrationManager.run_migrations(message=message)
 
 @app.command()
-def relation():
+def relation(verbose: bool = typer.Option(False, "--verbose", "-v", help="Muestra la traza del error si falla la generación.")):
     """Genera una relación entre dos entidades existentes."""
     try:
-        manager = RelationManager()
+        from fastapi_maker.generators.relation_manager import RelationManager
+        from fastapi_maker.generators.router_update import RouterUpdater
+
+        manager = RelationManager(verbose=verbose)
         manager.create_relation()
         updater = RouterUpdater()
         updater.update_all_routers_descriptions()
@@ -109,6 +114,8 @@ def lint(
     Nota: --fix solo corrige problemas superficiales de estilo,
     no modifica la lógica de tu código.
     """
+    from fastapi_maker.utils.ruff_executor import RuffExecutor
+
     RuffExecutor.execute(
         check=check,
         fix=fix,
@@ -132,6 +139,8 @@ def audit(
         fam audit          # Solo verifica
         fam audit --fix    # Verifica e intenta corregir
     """
+    from fastapi_maker.generators.audit_manager import AuditManager
+
     try:  
         auditor = AuditManager(fix_mode=fix)
         if auditor.run_audit():
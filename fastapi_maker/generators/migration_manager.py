@@ -5,14 +5,44 @@
 # Licencia: MIT License
 # ---------------------------------------------------
 
+import contextlib
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import typer
 import os
 from pathlib import Path
-import sqlite3
-from urllib.parse import urlparse
-from dotenv import load_dotenv
+from urllib.parse import ParseResult, urlparse
+
+
+@lru_cache(maxsize=1)
+def _get_database_url() -> str:
+    """
+    Obtiene la URL de la base de datos desde las variables de entorno.
+
+    El resultado se memoriza: el .env se busca y se carga una sola vez.
+
+    Returns:
+        str: URL de la base de datos
+    """
+    # Primero cargar el .env si existe
+    MigrationManager._load_env_from_project_root()
+
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        typer.echo("   DATABASE_URL no está configurada en el archivo .env")
+        typer.echo("   Usando base de datos SQLite por defecto...")
+        db_url = "sqlite:///./app.db"
+
+    return db_url
+
+
+@lru_cache(maxsize=None)
+def _parsed_url(url: str) -> ParseResult:
+    """Parsea una URL de conexión una sola vez por valor distinto."""
+    return urlparse(url)
+
 
 class MigrationManager:
     """Clase para manejar operaciones de migración de Alembic."""
@@ -20,6 +50,9 @@ class MigrationManager:
     @staticmethod
     def _load_env_from_project_root():
         """Busca y carga el archivo .env desde el directorio actual o padres."""
+        # Mismo parser que usan env.py y database.py del proyecto generado
+        from dotenv import load_dotenv
+
         current_path = Path.cwd()
         
         # Buscar .env en el directorio actual y padres
@@ -41,63 +74,26 @@ class MigrationManager:
         return False
 
     @staticmethod
-    def _get_database_url() -> str:
-        """
-        Obtiene la URL de la base de datos desde las variables de entorno.
-        
-        Returns:
-            str: URL de la base de datos
-        """
-        # Primero cargar el .env si existe
-        MigrationManager._load_env_from_project_root()
-        
-        db_url = os.getenv("DATABASE_URL")
-        if not db_url:
-            typer.echo("   DATABASE_URL no está configurada en el archivo .env")
-            typer.echo("   Usando base de datos SQLite por defecto...")
-            db_url = "sqlite:///./app.db"
-        
-        return db_url
-
-    @staticmethod
-    def _get_database_type(db_url: str) -> str:
-        """
-        Determina el tipo de base de datos a partir de la URL.
-        
-        Args:
-            db_url: URL de conexión
-            
-        Returns:
-            str: 'sqlite', 'postgresql', 'mysql' o 'desconocido'
-        """
-        db_url = db_url.lower()
-        if db_url.startswith("sqlite://"):
-            return "sqlite"
-        elif db_url.startswith("postgresql://") or db_url.startswith("postgres://"):
-            return "postgresql"
-        elif db_url.startswith("mysql://") or db_url.startswith("mysql+pymysql://"):
-            return "mysql"
-        else:
-            return "desconocido"
-
-    @staticmethod
-    def _create_sqlite_database(db_path: str) -> bool:
+    def _create_sqlite_database(parsed: ParseResult) -> bool:
         """
         Crea la base de datos SQLite si no existe.
         
         Args:
-            db_path: Ruta al archivo de la base de datos
+            parsed: URL de conexión a SQLite ya parseada
             
         Returns:
             bool: True si se creó exitosamente
         """
+        # sqlite:///./app.db -> ./app.db, sqlite:////abs/app.db -> /abs/app.db
+        db_path = parsed.netloc + parsed.path if parsed.netloc else parsed.path[1:]
         try:
             db_file = Path(db_path)
             db_file.parent.mkdir(parents=True, exist_ok=True)
             
             if not db_file.exists():
-                conn = sqlite3.connect(str(db_file))
-                conn.close()
+                # Un archivo vacío es una base SQLite válida: la cabecera se
+                # escribe con el primer CREATE TABLE de alembic
+                db_file.touch()
                 typer.echo(f"  Base de datos SQLite creada: {db_file}")
             else:
                 typer.echo(f"   Base de datos SQLite ya existe: {db_file}")
@@ -120,12 +116,12 @@ class MigrationManager:
             return False
 
     @staticmethod
-    def _create_postgres_database(db_url: str) -> bool:
+    def _create_postgres_database(parsed: ParseResult) -> bool:
         """
         Crea la base de datos PostgreSQL si no existe.
         
         Args:
-            db_url: URL de conexión a PostgreSQL
+            parsed: URL de conexión a PostgreSQL ya parseada
             
         Returns:
             bool: True si se creó exitosamente
@@ -135,21 +131,25 @@ class MigrationManager:
 
         try:
             import psycopg2
+            from psycopg2 import errors
+            from psycopg2.extensions import quote_ident
             
-            parsed = urlparse(db_url)
             db_name = parsed.path[1:]  # Remover el '/' inicial
             if not db_name:
                 typer.echo("  No se especificó el nombre de la base de datos en la URL", err=True)
                 return False
 
+            # psycopg2 no entiende el sufijo del driver de SQLAlchemy (postgresql+psycopg://)
+            scheme = parsed.scheme.split("+")[0]
+
             # Conectar a la base de datos por defecto (postgres) para crear la nueva
-            default_url = db_url.split('/' + db_name)[0] + '/postgres'
+            default_url = parsed._replace(scheme=scheme, path="/postgres").geturl()
             
             try:
                 conn = psycopg2.connect(default_url)
             except psycopg2.OperationalError as e:
                 # Intentar con la base de datos template1 como fallback
-                default_url = db_url.split('/' + db_name)[0] + '/template1'
+                default_url = parsed._replace(scheme=scheme, path="/template1").geturl()
                 try:
                     conn = psycopg2.connect(default_url)
                 except psycopg2.OperationalError as e2:
@@ -165,8 +165,12 @@ class MigrationManager:
             exists = cursor.fetchone()
             
             if not exists:
-                cursor.execute(f'CREATE DATABASE "{db_name}"')
-                typer.echo(f"  Base de datos PostgreSQL creada: {db_name}")
+                try:
+                    cursor.execute(f"CREATE DATABASE {quote_ident(db_name, cursor)}")
+                    typer.echo(f"  Base de datos PostgreSQL creada: {db_name}")
+                except errors.DuplicateDatabase:
+                    # Otra invocación concurrente la creó entre el SELECT y el CREATE
+                    typer.echo(f"   Base de datos PostgreSQL ya existe: {db_name}")
             else:
                 typer.echo(f"   Base de datos PostgreSQL ya existe: {db_name}")
             
@@ -190,12 +194,12 @@ class MigrationManager:
             return False
 
     @staticmethod
-    def _create_mysql_database(db_url: str) -> bool:
+    def _create_mysql_database(parsed: ParseResult) -> bool:
         """
         Crea la base de datos MySQL si no existe.
         
         Args:
-            db_url: URL de conexión a MySQL
+            parsed: URL de conexión a MySQL ya parseada
             
         Returns:
             bool: True si se creó exitosamente
@@ -206,7 +210,6 @@ class MigrationManager:
         try:
             import MySQLdb
             
-            parsed = urlparse(db_url)
             db_name = parsed.path[1:]  # Remover el '/' inicial
             if not db_name:
                 typer.echo("  No se especificó el nombre de la base de datos en la URL", err=True)
@@ -233,12 +236,15 @@ class MigrationManager:
             
             cursor = conn.cursor()
             
-            # Verificar si la base de datos ya existe
-            cursor.execute("SHOW DATABASES LIKE %s", (db_name,))
-            exists = cursor.fetchone()
+            # Crear solo si no existe en un único round-trip: MySQL informa
+            # 1 fila afectada al crearla y 0 (con un warning) si ya existía
+            quoted_name = db_name.replace("`", "``")
+            created = cursor.execute(
+                f"CREATE DATABASE IF NOT EXISTS `{quoted_name}` "
+                "CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
+            )
             
-            if not exists:
-                cursor.execute(f"CREATE DATABASE `{db_name}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+            if created:
                 typer.echo(f"  Base de datos MySQL creada: {db_name}")
             else:
                 typer.echo(f"   Base de datos MySQL ya existe: {db_name}")
@@ -251,6 +257,13 @@ class MigrationManager:
             typer.echo(f"  Error creando base de datos MySQL: {str(e)}", err=True)
             return False
 
+    @staticmethod
+    def _skip_unknown_database(parsed: ParseResult) -> bool:
+        """Omite la creación para motores de base de datos no soportados."""
+        typer.echo(f"   Tipo de base de datos no reconocido: {parsed.scheme}", err=True)
+        typer.echo("   Continuando sin crear la base de datos...", err=True)
+        return True
+
     @staticmethod
     def _ensure_database_exists() -> bool:
         """
@@ -260,38 +273,117 @@ class MigrationManager:
             bool: True si la base de datos existe o fue creada exitosamente
         """
         try:
-            db_url = MigrationManager._get_database_url()
-            db_type = MigrationManager._get_database_type(db_url)
-            
-            if db_type == "sqlite":
-                # Extraer la ruta del archivo de la URL
-                if db_url.startswith("sqlite:///"):
-                    db_path = db_url.replace("sqlite:///", "")
-                else:
-                    db_path = db_url.replace("sqlite://", "")
-                return MigrationManager._create_sqlite_database(db_path)
-                
-            elif db_type == "postgresql":
-                return MigrationManager._create_postgres_database(db_url)
-                
-            elif db_type == "mysql":
-                return MigrationManager._create_mysql_database(db_url)
-                
-            else:
-                typer.echo(f"   Tipo de base de datos no reconocido: {db_type}", err=True)
-                typer.echo("   Continuando sin crear la base de datos...", err=True)
-                return True
+            parsed = _parsed_url(_get_database_url())
+
+            # 'postgresql+psycopg' -> 'postgresql', 'mysql+pymysql' -> 'mysql'
+            dialect = parsed.scheme.lower().split("+")[0]
+            create_database = _DIALECTS.get(dialect, MigrationManager._skip_unknown_database)
+            return create_database(parsed)
                 
         except Exception as e:
             typer.echo(f"  Error verificando base de datos: {str(e)}", err=True)
             typer.echo("   Continuando sin crear la base de datos...", err=True)
             return True
 
+    @staticmethod
+    def _stream_command(cmd: list) -> None:
+        """
+        Ejecuta un comando mostrando su salida línea a línea mientras se produce.
+
+        stderr se combina con stdout para conservar el orden de los mensajes
+        y no acumular toda la salida en memoria.
+
+        Raises:
+            subprocess.CalledProcessError: Si el comando termina con error.
+        """
+        with subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1
+        ) as proc:
+            for line in proc.stdout:
+                typer.echo(line, nl=False)
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+    @staticmethod
+    def _run_alembic_subprocess(message: str = None) -> None:
+        """
+        Ejecuta alembic como subproceso (fallback si alembic no es importable).
+
+        Args:
+            message: Mensaje opcional para la revisión de migración.
+
+        Raises:
+            subprocess.CalledProcessError: Si cualquiera de los comandos falla.
+        """
+        # Construir el comando de revision con autogenerate
+        revision_cmd = [sys.executable, "-m", "alembic", "revision", "--autogenerate"]
+        if message:
+            revision_cmd.extend(["-m", message])
+
+        typer.echo("\n  Ejecutando alembic revision --autogenerate...")
+        MigrationManager._stream_command(revision_cmd)
+
+        typer.echo("\n  Ejecutando alembic upgrade head...")
+        MigrationManager._stream_command([sys.executable, "-m", "alembic", "upgrade", "head"])
+
+    @staticmethod
+    def _load_alembic():
+        """
+        Importa alembic y construye su configuración.
+
+        Returns:
+            tuple | None: (command, config, CommandError) o None si alembic no es importable
+        """
+        try:
+            from alembic import command
+            from alembic.config import Config
+            from alembic.util import CommandError
+        except ImportError:
+            return None
+        return command, Config("alembic.ini"), CommandError
+
+    @staticmethod
+    def _env_reads_shared_connection(cfg) -> bool:
+        """
+        Indica si el env.py del proyecto usa la conexión de config.attributes.
+
+        Los proyectos generados antes de este soporte abren siempre su propia
+        conexión; crearles una compartida solo añadiría una conexión ociosa.
+        """
+        script_location = cfg.get_main_option("script_location") or "alembic"
+        try:
+            env_source = (Path(script_location) / "env.py").read_text(encoding="utf-8")
+        except OSError:
+            return False
+        return "config.attributes" in env_source
+
+    @staticmethod
+    def _create_shared_engine():
+        """
+        Crea el engine con el que revision y upgrade comparten una única conexión.
+
+        Returns:
+            Engine | None: None si DATABASE_URL no está definida o no se puede
+            crear el engine; en ese caso env.py abre su propia conexión.
+        """
+        db_url = os.getenv("DATABASE_URL")
+        if not db_url:
+            return None
+        try:
+            from sqlalchemy import create_engine, pool
+            return create_engine(db_url, poolclass=pool.NullPool)
+        except Exception:
+            return None
+
     @staticmethod
     def run_migrations(message: str = None) -> None:
         """
         Ejecuta alembic revision --autogenerate (con mensaje opcional) y alembic upgrade head.
 
+        Los comandos se invocan en el mismo proceso mediante `alembic.command`,
+        evitando arrancar un intérprete nuevo por cada comando. Si alembic no
+        es importable, se recurre a ejecutarlo como subproceso.
+
         Args:
             message: Mensaje opcional para la revisión de migración.
 
@@ -299,9 +391,13 @@ class MigrationManager:
             typer.Exit: Si cualquiera de los comandos de alembic falla.
         """
         try:
-            # Verificar y crear la base de datos si es necesario
+            # Verificar la base de datos mientras se importa alembic: son tareas
+            # independientes y ambas pasan la mayor parte del tiempo esperando I/O
             typer.echo("🔍 Verificando base de datos...")
-            database_ready = MigrationManager._ensure_database_exists()
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                database_future = executor.submit(MigrationManager._ensure_database_exists)
+                alembic_future = executor.submit(MigrationManager._load_alembic)
+                database_ready = database_future.result()
             
             if not database_ready:
                 typer.echo("  No se pudo crear/verificar la base de datos", err=True)
@@ -309,28 +405,52 @@ class MigrationManager:
                     typer.echo("  Migraciones canceladas.")
                     raise typer.Exit(code=1)
 
-            # Construir el comando de revision con autogenerate
-            revision_cmd = [sys.executable, "-m", "alembic", "revision", "--autogenerate"]
-            if message:
-                revision_cmd.extend(["-m", message])
-
-            typer.echo("\n  Ejecutando alembic revision --autogenerate...")
-            result = subprocess.run(revision_cmd, check=True, capture_output=True, text=True)
-            if result.stdout:
-                typer.echo(result.stdout)
-            if result.stderr:
-                typer.echo(result.stderr, err=True)
-
-            typer.echo("\n  Ejecutando alembic upgrade head...")
-            upgrade_cmd = [sys.executable, "-m", "alembic", "upgrade", "head"]
-            result = subprocess.run(upgrade_cmd, check=True, capture_output=True, text=True)
-            if result.stdout:
-                typer.echo(result.stdout)
-            if result.stderr:
-                typer.echo(result.stderr, err=True)
+            alembic = alembic_future.result()
+            if alembic is None:
+                MigrationManager._run_alembic_subprocess(message)
+                typer.echo("\n  Migraciones aplicadas exitosamente.")
+                return
+
+            # La salida de alembic llega por logging (configurado en alembic.ini)
+            command, cfg, CommandError = alembic
+            engine = (
+                MigrationManager._create_shared_engine()
+                if MigrationManager._env_reads_shared_connection(cfg)
+                else None
+            )
+            try:
+                with contextlib.ExitStack() as stack:
+                    connection = None
+                    if engine is not None:
+                        # env.py usa esta conexión si la encuentra en config.attributes.
+                        # Sin transacción exterior: context.begin_transaction() de env.py
+                        # confirma cada comando por separado, como con conexiones propias
+                        # (importante en backends sin DDL transaccional, p. ej. MySQL)
+                        connection = stack.enter_context(engine.connect())
+                        cfg.attributes["connection"] = connection
+
+                    typer.echo("\n  Ejecutando alembic revision --autogenerate...")
+                    command.revision(cfg, message=message, autogenerate=True)
+
+                    if connection is not None:
+                        # La autogeneración deja abierta la transacción implícita de sus
+                        # lecturas; descartarla (como al cerrar una conexión propia) hace
+                        # que upgrade empiece limpio y confirme sus propias transacciones
+                        connection.rollback()
+
+                    typer.echo("\n  Ejecutando alembic upgrade head...")
+                    command.upgrade(cfg, "head")
+            except CommandError as e:
+                typer.echo(f"\n  Error al ejecutar el comando de alembic: {str(e)}", err=True)
+                raise typer.Exit(code=1)
+            finally:
+                if engine is not None:
+                    engine.dispose()
 
             typer.echo("\n  Migraciones aplicadas exitosamente.")
 
+        except typer.Exit:
+            raise
         except subprocess.CalledProcessError as e:
             typer.echo(f"\n  Error al ejecutar el comando de alembic: {e.cmd}", err=True)
             if e.stdout:
@@ -340,4 +460,13 @@ class MigrationManager:
             raise typer.Exit(code=1)
         except Exception as e:
             typer.echo(f"\n  Error inesperado durante las migraciones: {str(e)}", err=True)
-            raise typer.Exit(code=1)
\ No newline at end of file
+            raise typer.Exit(code=1)
+
+
+# Creación de base de datos por dialecto (esquema de la URL sin el driver)
+_DIALECTS = {
+    "sqlite": MigrationManager._create_sqlite_database,
+    "postgresql": MigrationManager._create_postgres_database,
+    "postgres": MigrationManager._create_postgres_database,
+    "mysql": MigrationManager._create_mysql_database,
+}
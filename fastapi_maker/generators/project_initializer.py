@@ -7,36 +7,16 @@
 
 from pathlib import Path
 import typer
+import contextlib
+import importlib.util
+import io
 import os
-import subprocess
-import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
 
-class ProjectInitializer:
-    def __init__(self):
-        self.base_dir = Path(".")
+# Contenido estático de los archivos del proyecto, codificado una sola vez al importar
 
-    def create_project_structure(self):
-        """Crear la estructura completa del proyecto"""
-        typer.echo(" Inicializando proyecto FastAPI...")
-
-        self._create_env_file()
-        self._create_requirements()
-        self._create_database_structure()
-        self._create_main_app()
-        self._create_alembic_structure()
-        self._create_app_folder()
-        self._create_config_files()
-
-        typer.echo(" Proyecto FastAPI inicializado exitosamente!")
-        typer.echo(" Next steps:")
-        typer.echo("   1. Configura tu DATABASE_URL en .env")
-        typer.echo("   2. Ejecuta: pip install -r requirements.txt")
-        typer.echo("   3. Ejecuta: fam create <entidad>")
-        typer.echo("   4. Ejecuta: fam migrate")
-
-    def _create_env_file(self):
-        """Crear archivo .env"""
-        env_content = '''# Database
+_ENV_CONTENT = '''# Database
 DATABASE_URL=sqlite:///./app.db
 
 # Examples
@@ -56,14 +36,9 @@ API_V1_STR=/api/v1
 
 # CORS
 ALLOWED_ORIGINS=["http://localhost:3000", "http://127.0.0.1:3000"]
-'''
-        env_file = self.base_dir / ".env"
-        env_file.write_text(env_content, encoding='utf-8')
-        typer.echo(" Creando archivo: .env")
-
-    def _create_requirements(self):
-        """Crear requirements.txt"""
-        requirements_content = '''fastapi>=0.104.0
+'''.encode('utf-8')
+
+_REQUIREMENTS_CONTENT = '''fastapi>=0.104.0
 uvicorn[standard]>=0.24.0
 sqlalchemy>=2.0.0
 alembic>=1.12.0
@@ -72,19 +47,9 @@ python-multipart>=0.0.6
 pydantic>=2.0.0
 #psycopg2-binary>=2.9.0  # Para PostgreSQL
 # mysqlclient>=2.0.0    # Para MySQL
-'''
-        requirements_file = self.base_dir / "requirements.txt"
-        requirements_file.write_text(requirements_content, encoding='utf-8')
-        typer.echo(" Creando archivo: requirements.txt")
+'''.encode('utf-8')
 
-    def _create_database_structure(self):
-        """Crear estructura de base de datos"""
-        db_dir = self.base_dir / "db"
-        db_dir.mkdir(exist_ok=True)
-        typer.echo(" Creando carpeta: db/")
-
-        # database.py - Configuración principal de BD
-        database_content = '''from sqlalchemy import create_engine
+_DATABASE_CONTENT = '''from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -109,13 +74,9 @@ def get_db():
         yield db
     finally:
         db.close()
-'''
-        database_file = db_dir / "database.py"
-        database_file.write_text(database_content, encoding='utf-8')
-        typer.echo(" Creando archivo: db/database.py")
+'''.encode('utf-8')
 
-        # base_mixin.py - Clase base para modelos
-        base_mixin_content = '''
+_BASE_MIXIN_CONTENT = '''
 from sqlalchemy import Column, Integer, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.ext.declarative import declared_attr
@@ -138,19 +99,9 @@ class BaseMixin:
     def to_dict(self):
         """Convierte el modelo a diccionario"""
         return {c.name: getattr(self, c.name) for c in self.__table__.columns}
-'''
-        base_mixin_file = db_dir / "base_mixin.py"
-        base_mixin_file.write_text(base_mixin_content, encoding='utf-8')
-        typer.echo(" Creando archivo: db/base_mixin.py")
+'''.encode('utf-8')
 
-        # seeders/__init__.py
-        seeders_dir = db_dir / "seeders"
-        seeders_dir.mkdir(exist_ok=True)
-        (seeders_dir / "__init__.py").touch()
-        typer.echo(" Creando carpeta: db/seeders/")
-
-        # seeders/base_seeder.py
-        base_seeder_content = '''from sqlalchemy.orm import Session
+_BASE_SEEDER_CONTENT = '''from sqlalchemy.orm import Session
 from typing import List, Type, Any
 import logging
 
@@ -184,22 +135,14 @@ class BaseSeeder:
             db.rollback()
             logger.error(f" Error en seeder para {self.model.__name__}: {e}")
             raise
-'''
-        base_seeder_file = seeders_dir / "base_seeder.py"
-        base_seeder_file.write_text(base_seeder_content, encoding='utf-8')
-        typer.echo(" Creando archivo: db/seeders/base_seeder.py")
+'''.encode('utf-8')
 
-        # seeders/__init__.py con imports
-        seeders_init_content = '''from .base_seeder import BaseSeeder
+_SEEDERS_INIT_CONTENT = '''from .base_seeder import BaseSeeder
 
 __all__ = ["BaseSeeder"]
-'''
-        seeders_init_file = seeders_dir / "__init__.py"
-        seeders_init_file.write_text(seeders_init_content, encoding='utf-8')
+'''.encode('utf-8')
 
-    def _create_main_app(self):
-        """Crear archivo principal de FastAPI"""
-        main_content = '''
+_MAIN_CONTENT = '''
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_standalone_docs import StandaloneDocs
@@ -252,14 +195,9 @@ def health_check(db=Depends(get_db)):
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
-    '''
-        main_file = self.base_dir / "main.py"
-        main_file.write_text(main_content, encoding='utf-8')
-        typer.echo(" Creando archivo: main.py")
+    '''.encode('utf-8')
 
-    def _create_openapi_config(self):
-        """Crear configuración personalizada para OpenAPI"""
-        openapi_config_content = '''
+_OPENAPI_CONFIG_CONTENT = '''
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
 from typing import Dict, Any
@@ -293,76 +231,9 @@ def custom_openapi(app: FastAPI) -> Dict[str, Any]:
 def setup_custom_openapi(app: FastAPI):
     """Configura el esquema OpenAPI personalizado en la aplicación"""
     app.openapi = lambda: custom_openapi(app)
-    '''
-
-        config_dir = self.base_dir / "app" / "core"
-        config_dir.mkdir(parents=True, exist_ok=True)
-
-        openapi_file = config_dir / "openapi_config.py"
-        openapi_file.write_text(openapi_config_content, encoding='utf-8')
-        typer.echo(" Creando archivo: app/core/openapi_config.py")
-
-    def _find_venv_python(self) -> Path:
-        """Busca el ejecutable de Python dentro del entorno virtual en el proyecto."""
-        possible_names = [".venv", "venv", "env"]
-        for name in possible_names:
-            venv_path = self.base_dir / name
-            if venv_path.exists():
-                if sys.platform == "win32":
-                    python_exe = venv_path / "Scripts" / "python.exe"
-                else:
-                    python_exe = venv_path / "bin" / "python"
-                if python_exe.exists():
-                    return python_exe
-        # Si no se encuentra, usar el Python actual (asumiendo que ya está activado)
-        return Path(sys.executable)
-
-    def _create_alembic_structure(self):
-        """Inicializa Alembic usando `alembic init` desde el entorno virtual."""
-        typer.echo("  Inicializando Alembic con `alembic init`...")
-
-        python_exe = self._find_venv_python()
-        typer.echo(f" Usando Python: {python_exe}")
-
-        # Verificar que Alembic esté instalado
-        try:
-            subprocess.run(
-                [str(python_exe), "-c", "import alembic"],
-                check=True,
-                capture_output=True
-            )
-        except subprocess.CalledProcessError:
-            typer.echo("  Alembic no está instalado. Asegúrate de ejecutar `pip install -r requirements.txt` primero.")
-            typer.echo("   Creando estructura manual como fallback...")
-            self._create_alembic_structure_manual()
-            return
+    '''.encode('utf-8')
 
-        alembic_dir = self.base_dir / "alembic"
-        if alembic_dir.exists():
-            typer.echo("  La carpeta 'alembic/' ya existe. Saltando `alembic init`.")
-        else:
-            try:
-                subprocess.run(
-                    [str(python_exe), "-m", "alembic", "init", "alembic"],
-                    cwd=self.base_dir,
-                    check=True,
-                    capture_output=True,
-                    text=True
-                )
-                typer.echo(" `alembic init` ejecutado exitosamente.")
-            except subprocess.CalledProcessError as e:
-                typer.echo(f" Error al ejecutar `alembic init`: {e.stderr}")
-                typer.echo("   Creando estructura manual como fallback...")
-                self._create_alembic_structure_manual()
-                return
-
-        # Personalizar los archivos clave
-        self._customize_alembic_files()
-
-    def _customize_alembic_files(self):
-        """Sobrescribe alembic.ini y alembic/env.py con configuración personalizada."""
-        # alembic.ini
-        alembic_ini_content = '''[alembic]
+_ALEMBIC_INI_CONTENT = '''[alembic]
 script_location = alembic
 sqlalchemy.url = ${DATABASE_URL}
 
@@ -389,12 +260,9 @@ formatter = generic
 [formatter_generic]
 format = %(levelname)-5.5s [%(name)s] %(message)s
 datefmt = %H:%M:%S
-'''
-        (self.base_dir / "alembic.ini").write_text(alembic_ini_content, encoding='utf-8')
-        typer.echo(" Personalizando: alembic.ini")
+'''.encode('utf-8')
 
-        # alembic/env.py
-        env_py_content = '''from logging.config import fileConfig
+_ALEMBIC_ENV_PY_CONTENT = '''from logging.config import fileConfig
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from alembic import context
@@ -433,6 +301,14 @@ def run_migrations_offline():
         context.run_migrations()
 
 def run_migrations_online():
+    # `fam migrate` comparte una conexión abierta entre revision y upgrade
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     url = get_url()
     connectable = engine_from_config(
         {"sqlalchemy.url": url},
@@ -448,53 +324,9 @@ if context.is_offline_mode():
     run_migrations_offline()
 else:
     run_migrations_online()
-'''
-        (self.base_dir / "alembic" / "env.py").write_text(env_py_content, encoding='utf-8')
-        typer.echo(" Personalizando: alembic/env.py")
-
-    def _create_alembic_structure_manual(self):
-        """Versión manual (tu implementación original) por si falla `alembic init`."""
-        alembic_ini_content = '''[alembic]
-script_location = alembic
-sqlalchemy.url = ${DATABASE_URL}
-
-[loggers]
-keys = root
-
-[handlers]
-keys = console
+'''.encode('utf-8')
 
-[formatters]
-keys = generic
-
-[logger_root]
-level = WARN
-handlers = console
-qualname =
-
-[handler_console]
-class = StreamHandler
-args = (sys.stderr,)
-level = NOTSET
-formatter = generic
-
-[formatter_generic]
-format = %(levelname)-5.5s [%(name)s] %(message)s
-datefmt = %H:%M:%S
-'''
-        alembic_ini_file = self.base_dir / "alembic.ini"
-        alembic_ini_file.write_text(alembic_ini_content, encoding='utf-8')
-        typer.echo(" Creando archivo: alembic.ini")
-
-        alembic_dir = self.base_dir / "alembic"
-        alembic_dir.mkdir(exist_ok=True)
-        typer.echo(" Creando carpeta: alembic/")
-
-        versions_dir = alembic_dir / "versions"
-        versions_dir.mkdir(exist_ok=True)
-        typer.echo(" Creando carpeta: alembic/versions/")
-
-        env_py_content = '''from logging.config import fileConfig
+_ALEMBIC_ENV_PY_MANUAL_CONTENT = '''from logging.config import fileConfig
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from alembic import context
@@ -546,6 +378,18 @@ def run_migrations_offline() -> None:
 
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode."""
+    # `fam migrate` comparte una conexión abierta entre revision y upgrade
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection, 
+            target_metadata=target_metadata
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     # Obtener la URL de la base de datos
     url = get_url()
 
@@ -569,12 +413,9 @@ if context.is_offline_mode():
     run_migrations_offline()
 else:
     run_migrations_online()
-'''
-        env_py_file = alembic_dir / "env.py"
-        env_py_file.write_text(env_py_content, encoding='utf-8')
-        typer.echo(" Creando archivo: alembic/env.py")
+'''.encode('utf-8')
 
-        script_mako_content = '''"""${message}
+_SCRIPT_MAKO_CONTENT = '''"""${message}
 
 Revision ID: ${up_revision}
 Revises: ${down_revision | comma,n}
@@ -598,40 +439,274 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     ${downgrades if downgrades else "pass"}
-'''
+'''.encode('utf-8')
+
+_GITIGNORE_CONTENT = '''# Environment
+.env
+.venv
+env/
+
+# Database
+*.db
+*.sqlite3
+
+# Python
+__pycache__/
+*.py[cod]
+*$py.class
+*.so
+.Python
+build/
+develop-eggs/
+dist/
+downloads/
+eggs/
+.eggs/
+lib/
+lib64/
+parts/
+sdist/
+var/
+wheels/
+*.egg-info/
+.installed.cfg
+*.egg
+
+# Alembic
+alembic/versions/*
+
+# IDE
+.vscode/
+.idea/
+*.swp
+*.swo
+
+# Logs
+*.log
+'''.encode('utf-8')
+
+
+class ProjectInitializer:
+    # Cantidad de mensajes de progreso que se acumulan antes de escribirlos
+    LOG_FLUSH_EVERY = 8
+    # Carpetas fijas del proyecto, creadas de una vez antes de escribir archivos.
+    # alembic/ no está aquí: `alembic init` exige que la carpeta no exista
+    PROJECT_DIRS = ("db", "db/seeders")
+
+    def __init__(self):
+        self.base_dir = Path(".")
+        self._log_buffer: List[str] = []
+
+    def create_project_structure(self):
+        """Crear la estructura completa del proyecto"""
+        try:
+            self._log(" Inicializando proyecto FastAPI...")
+            self._create_dirs(self.PROJECT_DIRS)
+
+            # Fases independientes: escriben rutas disjuntas (.env, requirements.txt, db/*, main.py)
+            self._write_files_parallel(
+                self._env_files,
+                self._requirements_files,
+                self._database_files,
+                self._main_app_files,
+            )
+            # Alembic usa el directorio de trabajo y app/ mueve db/ y main.py: van después
+            self._create_alembic_structure()
+            self._create_app_folder()
+            self._create_config_files()
+
+            self._log(" Proyecto FastAPI inicializado exitosamente!")
+            self._log(" Next steps:")
+            self._log("   1. Configura tu DATABASE_URL en .env")
+            self._log("   2. Ejecuta: pip install -r requirements.txt")
+            self._log("   3. Ejecuta: fam create <entidad>")
+            self._log("   4. Ejecuta: fam migrate")
+        finally:
+            self._flush_log()
+
+    def _log(self, message: str):
+        """Acumula un mensaje de progreso; se vuelcan en bloque cada LOG_FLUSH_EVERY mensajes."""
+        self._log_buffer.append(message)
+        if len(self._log_buffer) >= self.LOG_FLUSH_EVERY:
+            self._flush_log()
+
+    def _flush_log(self):
+        """Escribe los mensajes acumulados con una sola escritura a stdout."""
+        if self._log_buffer:
+            typer.echo("\n".join(self._log_buffer))
+            self._log_buffer.clear()
+
+    def _write_files_parallel(self, *builders: Callable[[], List[Tuple[Path, bytes]]]):
+        """
+        Ejecuta los constructores de archivos y escribe el resultado en paralelo.
+
+        Cada constructor devuelve tuplas (ruta, contenido) sin tocar el disco;
+        las carpetas ya deben existir (ver PROJECT_DIRS).
+        """
+        with ThreadPoolExecutor(max_workers=len(builders)) as executor:
+            files = [f for batch in executor.map(lambda build: build(), builders) for f in batch]
+            list(executor.map(lambda f: self._write_file(*f), files))
+
+        for path, _ in files:
+            self._log(f" Creando archivo: {path.relative_to(self.base_dir).as_posix()}")
+
+    def _create_dirs(self, dirs: Tuple[str, ...]):
+        """Crea las carpetas indicadas (relativas a base_dir) con un solo mkdir por carpeta."""
+        for folder in sorted(set(dirs)):
+            (self.base_dir / folder).mkdir(parents=True, exist_ok=True)
+            self._log(f" Creando carpeta: {folder}/")
+
+    def _write_file(self, path: Path, data: bytes):
+        """Escribe el contenido (ya codificado) de un archivo del proyecto si cambió."""
+        # Si el archivo ya tiene este contenido no se reescribe: así no cambia su
+        # mtime ni despierta a los watchers (uvicorn --reload, editores)
+        try:
+            if os.stat(path).st_size == len(data) and path.read_bytes() == data:
+                return
+        except FileNotFoundError:
+            pass
+
+        # os.open/os.write directo: sin la capa de buffers de io para un único write.
+        # O_BINARY evita la traducción de saltos de línea en Windows
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+        fd = os.open(path, flags, 0o666)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
+    def _env_files(self) -> List[Tuple[Path, bytes]]:
+        """Contenido del archivo .env"""
+        return [(self.base_dir / ".env", _ENV_CONTENT)]
+
+    def _requirements_files(self) -> List[Tuple[Path, bytes]]:
+        """Contenido de requirements.txt"""
+        return [(self.base_dir / "requirements.txt", _REQUIREMENTS_CONTENT)]
+
+    def _database_files(self) -> List[Tuple[Path, bytes]]:
+        """Contenido de la estructura de base de datos (db/ y db/seeders/)"""
+        db_dir = self.base_dir / "db"
+        seeders_dir = db_dir / "seeders"
+
+        # database.py - Configuración principal de BD
+        # base_mixin.py - Clase base para modelos
+        # seeders/base_seeder.py
+        # seeders/__init__.py con imports
+        return [
+            (db_dir / "database.py", _DATABASE_CONTENT),
+            (db_dir / "base_mixin.py", _BASE_MIXIN_CONTENT),
+            (seeders_dir / "__init__.py", _SEEDERS_INIT_CONTENT),
+            (seeders_dir / "base_seeder.py", _BASE_SEEDER_CONTENT),
+        ]
+
+    def _main_app_files(self) -> List[Tuple[Path, bytes]]:
+        """Contenido del archivo principal de FastAPI"""
+        return [(self.base_dir / "main.py", _MAIN_CONTENT)]
+
+    def _create_openapi_config(self):
+        """Crear configuración personalizada para OpenAPI"""
+        config_dir = self.base_dir / "app" / "core"
+        config_dir.mkdir(parents=True, exist_ok=True)
+
+        openapi_file = config_dir / "openapi_config.py"
+        self._write_file(openapi_file, _OPENAPI_CONFIG_CONTENT)
+        self._log(" Creando archivo: app/core/openapi_config.py")
+
+    def _create_alembic_structure(self):
+        """Inicializa Alembic ejecutando `alembic init` dentro del proceso actual."""
+        self._log("  Inicializando Alembic con `alembic init`...")
+
+        # alembic es dependencia de fam: si falta, el entorno está roto y se usa la versión manual
+        if importlib.util.find_spec("alembic") is None:
+            self._log("  Alembic no está instalado. Asegúrate de ejecutar `pip install -r requirements.txt` primero.")
+            self._log("   Creando estructura manual como fallback...")
+            self._create_alembic_structure_manual()
+            return
+
+        alembic_dir = self.base_dir / "alembic"
+        if alembic_dir.exists():
+            self._log("  La carpeta 'alembic/' ya existe. Saltando `alembic init`.")
+        else:
+            from alembic.util import CommandError
+            try:
+                self._run_alembic_init()
+                self._log(" `alembic init` ejecutado exitosamente.")
+            except CommandError as e:
+                self._log(f" Error al ejecutar `alembic init`: {e}")
+                self._log("   Creando estructura manual como fallback...")
+                self._create_alembic_structure_manual()
+                return
+
+        # Personalizar los archivos clave
+        self._customize_alembic_files()
+
+    def _run_alembic_init(self):
+        """Ejecuta `alembic init alembic` dentro del proceso actual."""
+        from alembic import command
+        from alembic.config import Config
+
+        # Descartar la salida de alembic, igual que capture_output en el subproceso
+        with contextlib.redirect_stdout(io.StringIO()):
+            command.init(Config(str(self.base_dir / "alembic.ini")), str(self.base_dir / "alembic"))
+
+    def _customize_alembic_files(self):
+        """Sobrescribe alembic.ini y alembic/env.py con configuración personalizada."""
+        # alembic.ini
+        self._write_file(self.base_dir / "alembic.ini", _ALEMBIC_INI_CONTENT)
+        self._log(" Personalizando: alembic.ini")
+
+        # alembic/env.py
+        self._write_file(self.base_dir / "alembic" / "env.py", _ALEMBIC_ENV_PY_CONTENT)
+        self._log(" Personalizando: alembic/env.py")
+
+    def _create_alembic_structure_manual(self):
+        """Versión manual (tu implementación original) por si falla `alembic init`."""
+        alembic_ini_file = self.base_dir / "alembic.ini"
+        self._write_file(alembic_ini_file, _ALEMBIC_INI_CONTENT)
+        self._log(" Creando archivo: alembic.ini")
+
+        self._create_dirs(("alembic", "alembic/versions"))
+        alembic_dir = self.base_dir / "alembic"
+
+        env_py_file = alembic_dir / "env.py"
+        self._write_file(env_py_file, _ALEMBIC_ENV_PY_MANUAL_CONTENT)
+        self._log(" Creando archivo: alembic/env.py")
+
         script_mako_file = alembic_dir / "script.py.mako"
-        script_mako_file.write_text(script_mako_content, encoding='utf-8')
-        typer.echo(" Creando archivo: alembic/script.py.mako")
+        self._write_file(script_mako_file, _SCRIPT_MAKO_CONTENT)
+        self._log(" Creando archivo: alembic/script.py.mako")
 
 
     def _create_app_folder(self):
         """Crear la carpeta app/ con subcarpetas y mover archivos principales"""
         app_dir = self.base_dir / "app"
         app_dir.mkdir(exist_ok=True)
-        typer.echo(" Creando carpeta: app/")
+        self._log(" Creando carpeta: app/")
 
         # Mover db/ a app/db/ si no está ya dentro de app/
         old_db = self.base_dir / "db"
         new_db = app_dir / "db"
         if old_db.exists() and not new_db.exists():
             old_db.rename(new_db)
-            typer.echo(" Moviendo db/ a app/db/")
+            self._log(" Moviendo db/ a app/db/")
         else:
             # Si no existe, crearla dentro de app/
             new_db.mkdir(exist_ok=True)
-            typer.echo(" Creando carpeta: app/db/")
+            self._log(" Creando carpeta: app/db/")
 
         # Crear carpeta core/ para configuración
         core_dir = app_dir / "core"
         core_dir.mkdir(exist_ok=True)
-        typer.echo(" Creando carpeta: app/core/")
+        self._log(" Creando carpeta: app/core/")
 
         # Mover main.py a app/main.py si no está ya dentro de app/
         old_main = self.base_dir / "main.py"
         new_main = app_dir / "main.py"
         if old_main.exists() and not new_main.exists():
             old_main.rename(new_main)
-            typer.echo(" Moviendo main.py a app/main.py")
+            self._log(" Moviendo main.py a app/main.py")
         else:
             # Si no existe, crear main.py vacío o con contenido básico
             new_main.write_text('''from fastapi import FastAPI
@@ -644,20 +719,20 @@ StandaloneDocs(app=app)
 def read_root():
     return {"message": "¡Bienvenido a FastAPI!"}
 ''', encoding='utf-8')
-            typer.echo(" Creando archivo: app/main.py")
+            self._log(" Creando archivo: app/main.py")
 
         # Crear carpeta api/ dentro de app/
         api_dir = app_dir / "api"
         api_dir.mkdir(exist_ok=True)
-        typer.echo(" Creando carpeta: app/api/")
+        self._log(" Creando carpeta: app/api/")
 
         # Crear app/api/__init__.py
         (api_dir / "__init__.py").touch()
-        typer.echo(" Creando archivo: app/api/__init__.py")
+        self._log(" Creando archivo: app/api/__init__.py")
 
         # Crear app/core/__init__.py
         (core_dir / "__init__.py").touch()
-        typer.echo(" Creando archivo: app/core/__init__.py")
+        self._log(" Creando archivo: app/core/__init__.py")
 
 
     def _create_config_files(self):
@@ -667,52 +742,9 @@ def read_root():
         self._create_openapi_config()
         
         # .gitignore
-        gitignore_content = '''# Environment
-.env
-.venv
-env/
-
-# Database
-*.db
-*.sqlite3
-
-# Python
-__pycache__/
-*.py[cod]
-*$py.class
-*.so
-.Python
-build/
-develop-eggs/
-dist/
-downloads/
-eggs/
-.eggs/
-lib/
-lib64/
-parts/
-sdist/
-var/
-wheels/
-*.egg-info/
-.installed.cfg
-*.egg
-
-# Alembic
-alembic/versions/*
-
-# IDE
-.vscode/
-.idea/
-*.swp
-*.swo
-
-# Logs
-*.log
-'''
         gitignore_file = self.base_dir / ".gitignore"
-        gitignore_file.write_text(gitignore_content, encoding='utf-8')
-        typer.echo(" Creando archivo: .gitignore")
+        self._write_file(gitignore_file, _GITIGNORE_CONTENT)
+        self._log(" Creando archivo: .gitignore")
 
         # README.md
         readme_content = '''# FastAPI Project
@@ -5,12 +5,18 @@
 # License: MIT License
 # ---------------------------------------------------
 
+import io
+import os
+import re
+import sys
+import tokenize
 import typer
 from pathlib import Path
-import questionary
-from typing import List
+from typing import Dict, List, Optional, Set, Tuple
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 from fastapi_maker.utils.code_editor import CodeEditor
 from fastapi_maker.templates.relation_templates import (
@@ -29,6 +35,36 @@ from fastapi_maker.templates.relation_templates import (
     get_update_method_with_foreign_key  # Nuevo
 )
 
+# Las plantillas solo dependen de sus argumentos: se memorizan para no rehacer el
+# mismo texto cuando varios lados de la relación (o varias relaciones) lo piden.
+# Invariante: las funciones de relation_templates deben seguir siendo puras
+# (sin estado ni E/S) y recibir solo argumentos hashables.
+_fk_tpl = lru_cache(maxsize=256)(get_foreign_key_template)
+_rel_tpl = lru_cache(maxsize=256)(get_relationship_template)
+_out_dto_tpl = lru_cache(maxsize=256)(get_out_dto_relation_field)
+_in_dto_tpl = lru_cache(maxsize=256)(get_in_dto_relation_field)
+_m2m_tpl = lru_cache(maxsize=256)(get_many_to_many_service_methods)
+_repo_tpl = lru_cache(maxsize=256)(get_get_by_ids_method)
+_association_tpl = lru_cache(maxsize=256)(get_association_table_template)
+_create_tpl = lru_cache(maxsize=256)(get_create_method_with_relation_filter)
+_create_m2m_tpl = lru_cache(maxsize=256)(get_create_method_with_many_to_many_relations)
+_update_fk_tpl = lru_cache(maxsize=256)(get_update_method_with_foreign_key)
+_update_m2m_tpl = lru_cache(maxsize=256)(get_update_method_with_many_to_many_relations)
+
+
+@lru_cache(maxsize=256)
+def _model_to_dto_lines(related_entity: str, is_list: bool) -> Tuple[str, ...]:
+    """Líneas no vacías de la lógica de model_to_dto, ya indentadas con 8 espacios y listas para insertar."""
+    return tuple(line for line in get_model_to_dto_logic(related_entity, is_list).split("\n") if line.strip())
+
+
+# Bloque "example" plano (sin llaves anidadas) dentro de model_config, como lo generan las plantillas.
+# `body` son las líneas del dict y termina justo antes de la línea con la llave de cierre
+_EXAMPLE_BLOCK_RE = re.compile(
+    r'model_config = \{.*?"json_schema_extra".*?"example"[^\n{}]*\{[^\n{}]*\n(?P<body>[^{}]*?)^[ \t]*\}',
+    re.DOTALL | re.MULTILINE,
+)
+
 
 class RelationType(Enum):
     ONE_TO_MANY = "one-to-many"
@@ -36,6 +72,26 @@ class RelationType(Enum):
     ONE_TO_ONE = "one-to-one"
 
 
+# Opciones del selector de tipo de relación: texto mostrado -> tipo (en orden de aparición)
+_RELATION_CHOICES = {
+    "Uno a Muchos (One-to-Many)": RelationType.ONE_TO_MANY,
+    "Muchos a Muchos (Many-to-Many)": RelationType.MANY_TO_MANY,
+    "Uno a Uno (One-to-One)": RelationType.ONE_TO_ONE,
+}
+_RELATION_CHOICE_NAMES = list(_RELATION_CHOICES)
+
+# Plantilla del campo de relación según el tipo de DTO
+_DTO_FIELD_TEMPLATES = {"out": _out_dto_tpl, "in": _in_dto_tpl, "update": _in_dto_tpl}
+_INPUT_DTO_KINDS = ("in", "update")
+
+# `from sqlalchemy import` o, con el grupo 1, `from sqlalchemy.orm import`
+_SQLA_IMPORT_RE = re.compile(r"from sqlalchemy(\.orm)? import")
+# Línea que contiene a la vez "return " y "OutDto" (en cualquier orden)
+_OUT_DTO_RETURN_RE = re.compile(r"^(?=.*return )(?=.*OutDto).*$", re.MULTILINE)
+# Campo declarado en un DTO: `    nombre: tipo ...`
+_DTO_FIELD_RE = re.compile(r"\s*([A-Za-z_]\w*)\s*:")
+
+
 @dataclass
 class RelationshipConfig:
     origin_entity: str
@@ -44,30 +100,124 @@ class RelationshipConfig:
     foreign_key_in_target: bool = True
     is_list_in_origin: bool = False
     is_list_in_target: bool = False
+    # Nombres derivados de cada entidad, calculados una sola vez
+    origin_class: str = field(init=False, repr=False)
+    target_class: str = field(init=False, repr=False)
+    origin_plural: str = field(init=False, repr=False)
+    target_plural: str = field(init=False, repr=False)
+    origin_fk_field: str = field(init=False, repr=False)
+    target_fk_field: str = field(init=False, repr=False)
+    origin_ids_field: str = field(init=False, repr=False)
+    target_ids_field: str = field(init=False, repr=False)
+    association_table: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.origin_class = self.origin_entity.capitalize()
+        self.target_class = self.target_entity.capitalize()
+        self.origin_plural = f"{self.origin_entity}s"
+        self.target_plural = f"{self.target_entity}s"
+        self.origin_fk_field = f"{self.origin_entity}_id"
+        self.target_fk_field = f"{self.target_entity}_id"
+        self.origin_ids_field = f"{self.origin_entity}_ids"
+        self.target_ids_field = f"{self.target_entity}_ids"
+        self.association_table = f"{self.origin_entity}_{self.target_entity}"
+
+
+@dataclass
+class EntityPaths:
+    """Rutas de los archivos de una entidad dentro de app/api."""
+    model: Path
+    repo: Path
+    service: Path
+    out_dto: Path
+    in_dto: Path
+    update_dto: Path
+
+    @classmethod
+    def for_entity(cls, base_path: Path, entity_name: str) -> "EntityPaths":
+        entity_dir = base_path / entity_name
+        dto_dir = entity_dir / "dto"
+        return cls(
+            model=entity_dir / f"{entity_name}_model.py",
+            repo=entity_dir / f"{entity_name}_repository.py",
+            service=entity_dir / f"{entity_name}_service.py",
+            out_dto=dto_dir / f"{entity_name}_out_dto.py",
+            in_dto=dto_dir / f"{entity_name}_in_dto.py",
+            update_dto=dto_dir / f"{entity_name}_update_dto.py",
+        )
+
+    def layer_files(self) -> Tuple[Path, ...]:
+        """DTOs, servicio y repositorio: los archivos que se editan tras los modelos."""
+        return (self.out_dto, self.in_dto, self.update_dto, self.service, self.repo)
+
+    def dto(self, kind: str) -> Path:
+        """Ruta del DTO según su tipo ("out", "in" o "update")."""
+        return {"out": self.out_dto, "in": self.in_dto, "update": self.update_dto}[kind]
+
+
+@dataclass
+class DtoIndex:
+    """Resultado de recorrer una vez las líneas de un DTO (ver `RelationManager._scan_dto`)."""
+    fields: Set[str]
+    model_config_idx: int
+    last_import_idx: int
+    present_imports: Set[str]
+
+
+def _silent(*args, **kwargs):
+    """Sustituye a typer.echo para la salida decorativa cuando stdout no es una terminal."""
 
 
 class RelationManager:
-    def __init__(self):
+    # Frames mostrados con --verbose: suficiente para ubicar el fallo sin recorrer toda la pila
+    TRACEBACK_LIMIT = 5
+    # Hilos para leer y escribir en paralelo los archivos de la relación
+    FLUSH_WORKERS = 4
+
+    def __init__(self, verbose: bool = False):
+        self.verbose = verbose
+        # Separadores y pasos siguientes solo tienen sentido en una terminal
+        self._interactive = sys.stdout.isatty()
+        self._echo = typer.echo if self._interactive else _silent
         self.base_path = Path("app/api")
         if not self.base_path.exists():
             typer.echo("  No se encontró la carpeta app/api. ¿Has inicializado el proyecto?")
             raise typer.Exit(1)
         self.editor = CodeEditor()
-        self.entities = self._get_existing_entities()
+        # Se escanean en create_relation: _execute no necesita la lista
+        self.entities: List[str] = []
+        # Líneas de los archivos editados; los cambios se escriben al final de cada relación
+        self._file_cache: Dict[Path, List[str]] = {}
+        self._dirty: Set[Path] = set()
+        # st_mtime_ns de cada archivo en caché y archivos ya validados en la relación actual
+        self._mtimes: Dict[Path, int] = {}
+        self._fresh: Set[Path] = set()
+        # Texto unido de cada archivo en caché, para búsquedas de contenido en una pasada
+        self._text_cache: Dict[Path, str] = {}
+        self._paths: Dict[str, EntityPaths] = {}
 
     def _get_existing_entities(self) -> List[str]:
-        return [
-            d.name for d in self.base_path.iterdir()
-            if d.is_dir() and (d / f"{d.name}_model.py").exists()
-        ]
+        # scandir reutiliza el tipo de entrada leído con el directorio: un solo stat por entidad
+        with os.scandir(self.base_path) as entries:
+            return [
+                e.name for e in entries
+                if e.is_dir()
+                and os.path.isfile(os.path.join(e.path, f"{e.name}_model.py"))
+            ]
 
     def create_relation(self):
+        self.entities = self._get_existing_entities()
         if len(self.entities) < 2:
             typer.echo("  Necesitas al menos dos entidades para crear una relación.")
             return
 
+        config = self._collect_inputs()
+        self._execute(config)
+
+    def _collect_inputs(self) -> RelationshipConfig:
+        """Hace todas las preguntas (incluida la confirmación) antes de tocar archivos."""
         typer.echo("\n  Creando relación entre entidades")
-        typer.echo("=" * 40)
+        self._echo("=" * 40)
 
         origin = self._select_entity("Selecciona la entidad de ORIGEN:", self.entities)
         relation_type = self._select_relation_type()
@@ -76,9 +226,14 @@ class RelationManager:
 
         config = self._configure_relationship(origin, target, relation_type)
         self._confirm_relationship(config)
+        return config
+
+    def _execute(self, config: RelationshipConfig):
+        """Genera la relación ya confirmada; no hace más preguntas al usuario."""
         self._generate_relationship(config)
 
     def _select_entity(self, message: str, choices: List[str]) -> str:
+        import questionary
         choice = questionary.select(message=message, choices=choices, use_shortcuts=True, qmark="➤", pointer="→").ask()
         if choice is None:
             typer.echo("\n  Operación cancelada por el usuario.")
@@ -86,14 +241,10 @@ class RelationManager:
         return choice
 
     def _select_relation_type(self) -> RelationType:
-        choices = [
-            {"name": "Uno a Muchos (One-to-Many)", "value": RelationType.ONE_TO_MANY},
-            {"name": "Muchos a Muchos (Many-to-Many)", "value": RelationType.MANY_TO_MANY},
-            {"name": "Uno a Uno (One-to-One)", "value": RelationType.ONE_TO_ONE},
-        ]
+        import questionary
         choice = questionary.select(
             message="Selecciona el tipo de relación:",
-            choices=[c["name"] for c in choices],
+            choices=_RELATION_CHOICE_NAMES,
             use_shortcuts=True,
             qmark="➤",
             pointer="→"
@@ -101,185 +252,330 @@ class RelationManager:
         if choice is None:
             typer.echo("\n  Operación cancelada.")
             raise typer.Exit(0)
-        return next(c["value"] for c in choices if c["name"] == choice)
+        return _RELATION_CHOICES[choice]
 
     def _configure_relationship(self, origin: str, target: str, relation_type: RelationType) -> RelationshipConfig:
-        if relation_type == RelationType.ONE_TO_MANY:
+        return _CONFIGURATORS[relation_type](self, origin, target, relation_type)
+
+    def _configure_one_to_many(self, origin: str, target: str, relation_type: RelationType) -> RelationshipConfig:
+        return RelationshipConfig(origin, target, relation_type,
+                                  foreign_key_in_target=True,
+                                  is_list_in_origin=True)
+
+    def _configure_many_to_many(self, origin: str, target: str, relation_type: RelationType) -> RelationshipConfig:
+        import questionary
+        list_choice = questionary.select(
+            message=f"¿Qué entidad debe tener la lista de IDs en su DTO?",
+            choices=[
+                f"{origin.capitalize()} (origen) - tendrá {target}_ids en su DTO",
+                f"{target.capitalize()} (destino) - tendrá {origin}_ids en su DTO"
+            ],
+            default=f"{origin.capitalize()} (origen) - tendrá {target}_ids en su DTO",
+            qmark="➤",
+            pointer="→"
+        ).ask()
+        if list_choice is None:
+            typer.echo("\n  Operación cancelada.")
+            raise typer.Exit(0)
+        if "origen" in list_choice.lower():
             return RelationshipConfig(origin, target, relation_type,
-                                      foreign_key_in_target=True,
-                                      is_list_in_origin=True)
-        elif relation_type == RelationType.MANY_TO_MANY:
-            list_choice = questionary.select(
-                message=f"¿Qué entidad debe tener la lista de IDs en su DTO?",
-                choices=[
-                    f"{origin.capitalize()} (origen) - tendrá {target}_ids en su DTO",
-                    f"{target.capitalize()} (destino) - tendrá {origin}_ids en su DTO"
-                ],
-                default=f"{origin.capitalize()} (origen) - tendrá {target}_ids en su DTO",
-                qmark="➤",
-                pointer="→"
-            ).ask()
-            if list_choice is None:
-                typer.echo("\n  Operación cancelada.")
-                raise typer.Exit(0)
-            if "origen" in list_choice.lower():
-                return RelationshipConfig(origin, target, relation_type,
-                                          foreign_key_in_target=False,
-                                          is_list_in_origin=True,
-                                          is_list_in_target=False)
-            else:
-                return RelationshipConfig(origin, target, relation_type,
-                                          foreign_key_in_target=False,
-                                          is_list_in_origin=False,
-                                          is_list_in_target=True)
-        elif relation_type == RelationType.ONE_TO_ONE:
-            side = questionary.select(
-                message="¿Qué entidad debe tener la foreign key?",
-                choices=[f"{origin.capitalize()} (origen)", f"{target.capitalize()} (destino)"],
-                default=f"{origin.capitalize()} (origen)",
-                qmark="➤",
-                pointer="→"
-            ).ask()
-            if side is None:
-                typer.echo("\n  Operación cancelada.")
-                raise typer.Exit(0)
-            foreign_key_in_target = "destino" in side.lower()
+                                      foreign_key_in_target=False,
+                                      is_list_in_origin=True,
+                                      is_list_in_target=False)
+        else:
             return RelationshipConfig(origin, target, relation_type,
-                                      foreign_key_in_target=foreign_key_in_target)
+                                      foreign_key_in_target=False,
+                                      is_list_in_origin=False,
+                                      is_list_in_target=True)
+
+    def _configure_one_to_one(self, origin: str, target: str, relation_type: RelationType) -> RelationshipConfig:
+        import questionary
+        side = questionary.select(
+            message="¿Qué entidad debe tener la foreign key?",
+            choices=[f"{origin.capitalize()} (origen)", f"{target.capitalize()} (destino)"],
+            default=f"{origin.capitalize()} (origen)",
+            qmark="➤",
+            pointer="→"
+        ).ask()
+        if side is None:
+            typer.echo("\n  Operación cancelada.")
+            raise typer.Exit(0)
+        foreign_key_in_target = "destino" in side.lower()
+        return RelationshipConfig(origin, target, relation_type,
+                                  foreign_key_in_target=foreign_key_in_target)
 
     def _confirm_relationship(self, config: RelationshipConfig):
-        typer.echo("\n  Resumen de la relación:")
-        typer.echo("=" * 40)
-        typer.echo(f"  Entidad origen: {config.origin_entity}")
-        typer.echo(f"  Entidad destino: {config.target_entity}")
-        typer.echo(f"  Tipo de relación: {config.relation_type.value}")
+        import questionary
+        # Todo el resumen sale en una sola escritura
+        rule = ["=" * 40] if self._interactive else []
+        summary = ["\n  Resumen de la relación:", *rule,
+                   f"  Entidad origen: {config.origin_entity}",
+                   f"  Entidad destino: {config.target_entity}",
+                   f"  Tipo de relación: {config.relation_type.value}"]
 
         if config.relation_type == RelationType.MANY_TO_MANY:
-            typer.echo(f"  Tabla de asociación: {config.origin_entity}_{config.target_entity}")
+            summary.append(f"  Tabla de asociación: {config.association_table}")
             if config.is_list_in_origin:
-                typer.echo(f"  Solo {config.origin_entity} tendrá {config.target_entity}_ids en su DTO")
+                summary.append(f"  Solo {config.origin_entity} tendrá {config.target_ids_field} en su DTO")
             else:
-                typer.echo(f"  Solo {config.target_entity} tendrá {config.origin_entity}_ids en su DTO")
+                summary.append(f"  Solo {config.target_entity} tendrá {config.origin_ids_field} en su DTO")
         elif config.relation_type in [RelationType.ONE_TO_MANY, RelationType.ONE_TO_ONE]:
             fk_entity = config.target_entity if config.foreign_key_in_target else config.origin_entity
-            fk_field = f"{config.origin_entity}_id" if config.foreign_key_in_target else f"{config.target_entity}_id"
-            typer.echo(f"  Foreign key en: {fk_entity}_model.py")
-            typer.echo(f"  Campo: {fk_field}")
-        
+            fk_field = config.origin_fk_field if config.foreign_key_in_target else config.target_fk_field
+            summary.append(f"  Foreign key en: {fk_entity}_model.py")
+            summary.append(f"  Campo: {fk_field}")
+
         if config.is_list_in_origin:
-            typer.echo(f"  {config.origin_entity}_out_dto tendrá: {config.target_entity}_ids: List[int]")
+            summary.append(f"  {config.origin_entity}_out_dto tendrá: {config.target_ids_field}: List[int]")
         if config.is_list_in_target:
-            typer.echo(f"  {config.target_entity}_out_dto tendrá: {config.origin_entity}_ids: List[int]")
+            summary.append(f"  {config.target_entity}_out_dto tendrá: {config.origin_ids_field}: List[int]")
 
-        typer.echo("=" * 40)
+        summary.extend(rule)
+        typer.echo("\n".join(summary))
         if not questionary.confirm("¿Generar la relación con estas configuraciones?", default=True).ask():
             typer.echo("\n  Operación cancelada.")
             raise typer.Exit(0)
 
     def _generate_relationship(self, config: RelationshipConfig):
-        typer.echo(f"\n  Generando relación {config.relation_type.value}...")
+        self._echo(f"\n  Generando relación {config.relation_type.value}...")
         try:
             self._ensure_sqlalchemy_imports(config.origin_entity)
             self._ensure_sqlalchemy_imports(config.target_entity)
 
-            if config.relation_type == RelationType.ONE_TO_MANY:
-                self._generate_one_to_many(config)
-            elif config.relation_type == RelationType.MANY_TO_MANY:
-                self._generate_many_to_many(config)
-            elif config.relation_type == RelationType.ONE_TO_ONE:
-                self._generate_one_to_one(config)
+            _GENERATORS[config.relation_type](self, config)
 
+            self._prefetch([
+                *self._paths_for(config.origin_entity).layer_files(),
+                *self._paths_for(config.target_entity).layer_files(),
+            ])
             self._update_dtos_for_relationship(config)
             self._update_services_for_relationship(config)
+            self._flush()
 
-            typer.echo(f"\n  Relación {config.relation_type.value} generada exitosamente!")
-            typer.echo(f"   Entre: {config.origin_entity} ↔ {config.target_entity}")
+            typer.echo(f"\n  Relación {config.relation_type.value} generada exitosamente!\n"
+                       f"   Entre: {config.origin_entity} ↔ {config.target_entity}")
             self._show_next_steps(config)
         except Exception as e:
             typer.echo(f"\n  Error generando relación: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            if self.verbose:
+                import traceback
+                traceback.print_exception(type(e), e, e.__traceback__, limit=self.TRACEBACK_LIMIT)
+            else:
+                typer.echo(f"   {type(e).__name__}. Usa --verbose para ver la traza del error.", err=True)
             raise typer.Exit(1)
 
     def _show_next_steps(self, config: RelationshipConfig):
-        typer.echo("\n  Próximos pasos:")
-        typer.echo(f"   1. Ejecutar: fam migrate -m 'Agregar relación entre {config.origin_entity} y {config.target_entity}'")
-        typer.echo("   2. Revisar el código generado en las carpetas de entidades")
+        if not self._interactive:
+            return
+        typer.echo("\n  Próximos pasos:\n"
+                   f"   1. Ejecutar: fam migrate -m 'Agregar relación entre {config.origin_entity} y {config.target_entity}'\n"
+                   "   2. Revisar el código generado en las carpetas de entidades")
 
     # --- Métodos auxiliares de edición ---
+    def _paths_for(self, entity_name: str) -> EntityPaths:
+        """Rutas de la entidad, construidas una sola vez por RelationManager."""
+        paths = self._paths.get(entity_name)
+        if paths is None:
+            paths = self._paths[entity_name] = EntityPaths.for_entity(self.base_path, entity_name)
+        return paths
+
+    def _read(self, path: Path) -> List[str]:
+        """
+        Líneas de `path`, leídas del disco solo la primera vez.
+
+        La caché sobrevive entre relaciones: la primera lectura de cada relación
+        compara st_mtime_ns y recarga el archivo si cambió fuera del generador.
+        """
+        lines = self._file_cache.get(path)
+        if lines is not None and path not in self._fresh:
+            self._fresh.add(path)
+            if path not in self._dirty and os.stat(path).st_mtime_ns != self._mtimes.get(path):
+                lines = None
+        if lines is None:
+            lines = self._store(path, *self._load(path))
+        return lines
+
+    def _load(self, path: Path) -> Tuple[int, List[str]]:
+        """Lee `path` del disco junto con su st_mtime_ns; no toca la caché (se usa desde hilos)."""
+        mtime = os.stat(path).st_mtime_ns
+        return mtime, self.editor.read_lines(path)
+
+    def _store(self, path: Path, mtime: int, lines: List[str]) -> List[str]:
+        self._mtimes[path] = mtime
+        self._file_cache[path] = lines
+        self._text_cache.pop(path, None)
+        self._fresh.add(path)
+        return lines
+
+    def _prefetch(self, paths: List[Path]):
+        """
+        Carga en paralelo los archivos que aún no están validados en esta relación.
+
+        Los hilos solo leen; la caché se actualiza en el hilo principal, así no
+        necesita lock. Los archivos que no existen se ignoran.
+        """
+        pending = [path for path in dict.fromkeys(paths) if path not in self._fresh and path.exists()]
+        if len(pending) < 2:
+            return
+        with ThreadPoolExecutor(max_workers=self.FLUSH_WORKERS) as pool:
+            futures = [(path, pool.submit(self._load, path)) for path in pending]
+        for path, future in futures:
+            try:
+                self._store(path, *future.result())
+            except FileNotFoundError:
+                continue
+
+    def _write(self, path: Path, lines: List[str]):
+        """
+        Guarda las líneas en la caché; el archivo se escribe en `_flush`.
+
+        Algunas plantillas insertan elementos con saltos de línea dentro: se
+        vuelven a partir como lo haría read_lines al releer el archivo escrito.
+        """
+        self._file_cache[path] = ("\n".join(lines) + "\n").splitlines()
+        self._text_cache.pop(path, None)
+        self._dirty.add(path)
+
+    def _exists(self, path: Path) -> bool:
+        """Un archivo ya validado en esta relación existe: solo se consulta el disco si no lo está."""
+        return path in self._fresh or path.exists()
+
+    def _text(self, path: Path) -> str:
+        """Líneas de `path` unidas con saltos de línea, calculadas una vez por versión del archivo."""
+        text = self._text_cache.get(path)
+        if text is None:
+            text = self._text_cache[path] = "\n".join(self._read(path))
+        return text
+
+    def _contains(self, path: Path, needle: str) -> bool:
+        """Indica si alguna línea de `path` contiene `needle` (que no debe incluir saltos de línea)."""
+        return needle in self._text(path)
+
+    def _read_model(self, entity_name: str) -> Tuple[Path, List[str]]:
+        """Ruta y líneas del modelo; la lectura (o la validación de la caché) ya comprueba que exista."""
+        model_path = self._paths_for(entity_name).model
+        try:
+            return model_path, self._read(model_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Archivo de modelo no encontrado para {entity_name}") from None
+
+    def _write_to_disk(self, path: Path) -> int:
+        """Escribe `path` desde la caché y devuelve su nuevo st_mtime_ns."""
+        self.editor.write_lines(path, self._file_cache[path])
+        return os.stat(path).st_mtime_ns
+
+    def _flush(self):
+        """Escribe una sola vez cada archivo modificado; la caché queda válida para la siguiente relación."""
+        dirty = list(self._dirty)
+        if len(dirty) > 1:
+            # Cada archivo es independiente: las escrituras se solapan en hilos
+            with ThreadPoolExecutor(max_workers=self.FLUSH_WORKERS) as pool:
+                self._mtimes.update(zip(dirty, pool.map(self._write_to_disk, dirty)))
+        else:
+            for path in dirty:
+                self._mtimes[path] = self._write_to_disk(path)
+        self._dirty.clear()
+        self._fresh.clear()
+
     def _ensure_sqlalchemy_imports(self, entity_name: str):
-        model_path = self.base_path / entity_name / f"{entity_name}_model.py"
-        if not model_path.exists():
-            raise FileNotFoundError(f"Archivo de modelo no encontrado para {entity_name}")
-        lines = self.editor.read_lines(model_path)
-        content = "\n".join(lines)
-        if "ForeignKey" not in content:
-            lines = self._add_foreign_key_import(lines)
-        if "relationship" not in content:
-            lines = self._add_relationship_import(lines)
-        self.editor.write_lines(model_path, lines)
-
-    def _add_foreign_key_import(self, lines: List[str]) -> List[str]:
-        for i, line in enumerate(lines):
-            if "from sqlalchemy import" in line and "ForeignKey" not in line:
-                lines[i] = line.replace("from sqlalchemy import", "from sqlalchemy import ForeignKey,")
-                return lines
-        return self.editor.ensure_import(lines, "from sqlalchemy import ForeignKey")
+        model_path, lines = self._read_model(entity_name)
+        has_foreign_key = self._contains(model_path, "ForeignKey")
+        has_relationship = self._contains(model_path, "relationship")
+        if has_foreign_key and has_relationship:
+            return
+        core_idx, orm_idx = self._locate_sqlalchemy_imports(lines)
+        if not has_foreign_key:
+            if core_idx is not None:
+                lines[core_idx] = lines[core_idx].replace("from sqlalchemy import", "from sqlalchemy import ForeignKey,")
+            else:
+                lines = self.editor.ensure_import(lines, "from sqlalchemy import ForeignKey")
+                core_idx, orm_idx = self._locate_sqlalchemy_imports(lines)
+        if not has_relationship:
+            if orm_idx is not None:
+                lines[orm_idx] = lines[orm_idx].replace("from sqlalchemy.orm import", "from sqlalchemy.orm import relationship,")
+            elif core_idx is not None:
+                lines.insert(core_idx + 1, "from sqlalchemy.orm import relationship\n")
+            else:
+                lines = self.editor.ensure_import(lines, "from sqlalchemy.orm import relationship")
+        self._write(model_path, lines)
 
-    def _add_relationship_import(self, lines: List[str]) -> List[str]:
-        for i, line in enumerate(lines):
-            if "from sqlalchemy.orm import" in line and "relationship" not in line:
-                lines[i] = line.replace("from sqlalchemy.orm import", "from sqlalchemy.orm import relationship,")
-                return lines
+    def _locate_sqlalchemy_imports(self, lines: List[str]) -> Tuple[Optional[int], Optional[int]]:
+        """Índices del primer `from sqlalchemy import` y del primer `from sqlalchemy.orm import`, en una pasada."""
+        core_idx = orm_idx = None
         for i, line in enumerate(lines):
-            if "from sqlalchemy import" in line:
-                lines.insert(i + 1, "from sqlalchemy.orm import relationship\n")
-                return lines
-        return self.editor.ensure_import(lines, "from sqlalchemy.orm import relationship")
+            match = _SQLA_IMPORT_RE.search(line)
+            if match is None:
+                continue
+            if match.group(1):
+                if orm_idx is None:
+                    orm_idx = i
+            elif core_idx is None:
+                core_idx = i
+            if core_idx is not None and orm_idx is not None:
+                break
+        return core_idx, orm_idx
 
     def _generate_one_to_many(self, config: RelationshipConfig):
-        self._add_foreign_key(config.target_entity, config.origin_entity)
-        self._add_relationship(config.origin_entity, config.target_entity, f"{config.target_entity}s", config.target_entity.capitalize(), is_list=True, back_populates=config.origin_entity)
-        self._add_relationship(config.target_entity, config.origin_entity, config.origin_entity, config.origin_entity.capitalize(), is_list=False, back_populates=f"{config.target_entity}s")
+        self._mutate_model(
+            config.target_entity, config.target_class,
+            self._foreign_key_op(config.origin_entity),
+            self._relationship_op(config.origin_entity, config.origin_class, is_list=False, back_populates=config.target_plural),
+        )
+        self._mutate_model(
+            config.origin_entity, config.origin_class,
+            self._relationship_op(config.target_plural, config.target_class, is_list=True, back_populates=config.origin_entity),
+        )
 
     def _generate_many_to_many(self, config: RelationshipConfig):
-        table_name = f"{config.origin_entity}_{config.target_entity}"
+        table_name = config.association_table
         self._create_association_table(config.origin_entity, config.target_entity)
         self._add_association_import_to_models(config.origin_entity, table_name)
         self._add_association_import_to_models(config.target_entity, table_name)
-        self._add_relationship(config.origin_entity, config.target_entity, f"{config.target_entity}s", config.target_entity.capitalize(), is_list=True, secondary=table_name, back_populates=f"{config.origin_entity}s")
-        self._add_relationship(config.target_entity, config.origin_entity, f"{config.origin_entity}s", config.origin_entity.capitalize(), is_list=True, secondary=table_name, back_populates=f"{config.target_entity}s")
+        self._mutate_model(
+            config.origin_entity, config.origin_class,
+            self._relationship_op(config.target_plural, config.target_class, is_list=True, secondary=table_name, back_populates=config.origin_plural),
+        )
+        self._mutate_model(
+            config.target_entity, config.target_class,
+            self._relationship_op(config.origin_plural, config.origin_class, is_list=True, secondary=table_name, back_populates=config.target_plural),
+        )
 
     def _generate_one_to_one(self, config: RelationshipConfig):
         unique = True
+        origin_ops = []
+        target_ops = []
         if config.foreign_key_in_target:
-            self._add_foreign_key(config.target_entity, config.origin_entity, unique=unique)
+            target_ops.append(self._foreign_key_op(config.origin_entity, unique=unique))
         else:
-            self._add_foreign_key(config.origin_entity, config.target_entity, unique=unique)
-        self._add_relationship(config.origin_entity, config.target_entity, config.target_entity, config.target_entity.capitalize(), is_list=False, uselist=False, back_populates=config.origin_entity)
-        self._add_relationship(config.target_entity, config.origin_entity, config.origin_entity, config.origin_entity.capitalize(), is_list=False, uselist=False, back_populates=config.target_entity)
-
-    def _add_foreign_key(self, entity_name: str, foreign_entity: str, unique: bool = False):
-        model_path = self.base_path / entity_name / f"{entity_name}_model.py"
-        if not model_path.exists():
-            raise FileNotFoundError(f"Archivo de modelo no encontrado para {entity_name}")
-        fk_line = get_foreign_key_template(foreign_entity, unique)
-        position, indent = self.editor.find_insert_position_in_class(model_path, entity_name.capitalize())
-        lines = self.editor.read_lines(model_path)
-        lines = self.editor.insert_line(lines, fk_line, position, indent)
-        self.editor.write_lines(model_path, lines)
-
-    def _add_relationship(self, entity_name: str, related_entity: str, relationship_name: str, related_class: str, is_list: bool = False, secondary: str = None, back_populates: str = None, uselist: bool = None):
-        model_path = self.base_path / entity_name / f"{entity_name}_model.py"
-        if not model_path.exists():
-            raise FileNotFoundError(f"Archivo de modelo no encontrado para {entity_name}")
-        lines = self.editor.read_lines(model_path)
-        if self.editor.ensure_content(lines, f"{relationship_name} = relationship"):
+            origin_ops.append(self._foreign_key_op(config.target_entity, unique=unique))
+        origin_ops.append(self._relationship_op(config.target_entity, config.target_class, is_list=False, uselist=False, back_populates=config.origin_entity))
+        target_ops.append(self._relationship_op(config.origin_entity, config.origin_class, is_list=False, uselist=False, back_populates=config.target_entity))
+        self._mutate_model(config.origin_entity, config.origin_class, *origin_ops)
+        self._mutate_model(config.target_entity, config.target_class, *target_ops)
+
+    def _foreign_key_op(self, foreign_entity: str, unique: bool = False) -> Tuple[str, Optional[str]]:
+        """Línea de foreign key para `_mutate_model` (siempre se inserta)."""
+        return _fk_tpl(foreign_entity, unique), None
+
+    def _relationship_op(self, relationship_name: str, related_class: str, is_list: bool = False, secondary: str = None, back_populates: str = None, uselist: bool = None) -> Tuple[str, Optional[str]]:
+        """Línea de relationship para `_mutate_model`; se omite si la relación ya existe."""
+        rel_line = _rel_tpl(relationship_name, related_class, is_list, secondary, back_populates, uselist)
+        return rel_line, f"{relationship_name} = relationship"
+
+    def _mutate_model(self, entity_name: str, class_name: str, *operations: Tuple[str, Optional[str]]):
+        """
+        Inserta en la clase del modelo las líneas de `operations` con una sola lectura y escritura.
+
+        Cada operación es (línea, texto_existente): si el modelo ya contiene
+        texto_existente, la línea no se inserta.
+        """
+        model_path, lines = self._read_model(entity_name)
+        new_lines = [line for line, needle in operations if needle is None or not self._contains(model_path, needle)]
+        if not new_lines:
             return
-        rel_line = get_relationship_template(relationship_name, related_class, is_list, secondary, back_populates, uselist)
-        position, indent = self.editor.find_insert_position_in_class(model_path, entity_name.capitalize())
-        lines = self.editor.insert_line(lines, rel_line, position, indent)
-        self.editor.write_lines(model_path, lines)
+        position, indent = self.editor.find_insert_position_in_class(model_path, class_name, lines)
+        lines = self.editor.insert_lines(lines, new_lines, position, indent)
+        self._write(model_path, lines)
 
     def _create_association_table(self, entity1: str, entity2: str):
         table_name = f"{entity1}_{entity2}"
@@ -287,7 +583,7 @@ class RelationManager:
         association_dir.mkdir(parents=True, exist_ok=True)
         (association_dir / "__init__.py").touch(exist_ok=True)
         table_path = association_dir / f"{table_name}.py"
-        table_code = get_association_table_template(entity1, entity2)
+        table_code = _association_tpl(entity1, entity2)
         table_path.write_text(table_code, encoding='utf-8')
         self._add_association_table_to_alembic_env(table_name)
 
@@ -296,9 +592,10 @@ class RelationManager:
         if not env_path.exists():
             return
         import_line = f"from app.api.association_models.{table_name} import {table_name}\n"
-        content = env_path.read_text(encoding="utf-8")
-        if import_line.strip() in content:
+        # Comprobación perezosa: se detiene en cuanto encuentra el import
+        if any(import_line.strip() in line for line in self.editor.iter_lines(env_path)):
             return
+        content = env_path.read_text(encoding="utf-8")
         lines = content.splitlines(keepends=True)
         new_lines = []
         inserted = False
@@ -326,12 +623,12 @@ class RelationManager:
         env_path.write_text("".join(new_lines), encoding='utf-8')
 
     def _add_association_import_to_models(self, entity_name: str, table_name: str):
-        model_path = self.base_path / entity_name / f"{entity_name}_model.py"
-        if not model_path.exists():
+        model_path = self._paths_for(entity_name).model
+        if not self._exists(model_path):
             return
-        lines = self.editor.read_lines(model_path)
+        lines = self._read(model_path)
         import_line = f"from app.api.association_models.{table_name} import {table_name}\n"
-        if any(f"from app.api.association_models.{table_name}" in line for line in lines):
+        if self._contains(model_path, f"from app.api.association_models.{table_name}"):
             return
         inserted = False
         for i, line in enumerate(lines):
@@ -345,88 +642,97 @@ class RelationManager:
                     break
         if not inserted:
             lines.insert(0, import_line)
-        self.editor.write_lines(model_path, lines)
+        self._write(model_path, lines)
 
     # --- DTOs ---
     def _update_dtos_for_relationship(self, config: RelationshipConfig):
         if config.is_list_in_origin:
-            self._update_out_dto(config.origin_entity, config.target_entity, is_list=True)
+            self._update_dto("out", config.origin_entity, config.target_entity, is_list=True)
         if config.is_list_in_target:
-            self._update_out_dto(config.target_entity, config.origin_entity, is_list=True)
+            self._update_dto("out", config.target_entity, config.origin_entity, is_list=True)
 
         if config.relation_type == RelationType.MANY_TO_MANY:
             if config.is_list_in_origin:
-                self._update_in_dto(config.origin_entity, config.target_entity, is_list=True)
-                self._update_update_dto(config.origin_entity, config.target_entity, is_list=True)
+                self._update_input_dtos(config.origin_entity, config.target_entity, is_list=True)
             if config.is_list_in_target:
-                self._update_in_dto(config.target_entity, config.origin_entity, is_list=True)
-                self._update_update_dto(config.target_entity, config.origin_entity, is_list=True)
+                self._update_input_dtos(config.target_entity, config.origin_entity, is_list=True)
         elif config.relation_type == RelationType.ONE_TO_MANY:
-            self._update_in_dto(config.target_entity, config.origin_entity, is_list=False)
-            self._update_update_dto(config.target_entity, config.origin_entity, is_list=False)
+            self._update_input_dtos(config.target_entity, config.origin_entity, is_list=False)
         elif config.relation_type == RelationType.ONE_TO_ONE:
             if config.foreign_key_in_target:
-                self._update_in_dto(config.target_entity, config.origin_entity, is_list=False)
-                self._update_update_dto(config.target_entity, config.origin_entity, is_list=False)
+                self._update_input_dtos(config.target_entity, config.origin_entity, is_list=False)
             else:
-                self._update_in_dto(config.origin_entity, config.target_entity, is_list=False)
-                self._update_update_dto(config.origin_entity, config.target_entity, is_list=False)
-
-    def _update_out_dto(self, entity_name: str, related_entity: str, is_list: bool):
-        self._update_dto(entity_name, related_entity, is_list, dto_suffix="_out_dto")
-
-    def _update_in_dto(self, entity_name: str, related_entity: str, is_list: bool):
-        self._update_dto(entity_name, related_entity, is_list, dto_suffix="_in_dto")
+                self._update_input_dtos(config.origin_entity, config.target_entity, is_list=False)
 
-    def _update_update_dto(self, entity_name: str, related_entity: str, is_list: bool):
-        self._update_dto(entity_name, related_entity, is_list, dto_suffix="_update_dto")
+    def _update_input_dtos(self, entity_name: str, related_entity: str, is_list: bool):
+        """Los DTOs de creación y actualización reciben el mismo campo."""
+        for kind in _INPUT_DTO_KINDS:
+            self._update_dto(kind, entity_name, related_entity, is_list)
 
-    def _update_dto(self, entity_name: str, related_entity: str, is_list: bool, dto_suffix: str):
-        dto_filename = f"{entity_name}{dto_suffix}.py"
-        dto_path = self.base_path / entity_name / "dto" / dto_filename
-        if not dto_path.exists():
+    def _update_dto(self, kind: str, entity_name: str, related_entity: str, is_list: bool):
+        """Añade el campo de la relación al DTO `kind` ("out", "in" o "update") de la entidad."""
+        dto_path = self._paths_for(entity_name).dto(kind)
+        if not self._exists(dto_path):
             return
         field_name = f"{related_entity}_ids" if is_list else f"{related_entity}_id"
-        lines = self.editor.read_lines(dto_path)
-        if self.editor.ensure_content(lines, f"    {field_name}:"):
+        typing_import = "from typing import List, Optional" if is_list else "from typing import Optional"
+        imports = (typing_import, "from pydantic import Field")
+        lines = self._read(dto_path)
+        index = self._scan_dto(lines, imports)
+        if field_name in index.fields:
             return
-        field_line = get_out_dto_relation_field(related_entity, is_list) if dto_suffix == "_out_dto" else get_in_dto_relation_field(related_entity, is_list)
-        model_config_idx = next((i for i, line in enumerate(lines) if "model_config" in line and "=" in line), -1)
+        field_line = _DTO_FIELD_TEMPLATES[kind](related_entity, is_list)
+        model_config_idx = index.model_config_idx
+        # Inserciones (índice, bloque) sobre las líneas originales
+        splices = []
         if model_config_idx == -1:
-            lines.append("    " + field_line)
+            splices.append((len(lines), ["    " + field_line]))
         else:
             indent = next((line[:len(line)-len(line.lstrip())] for line in lines[model_config_idx-1::-1] if line.strip() and ":" in line and "class" not in line), "    ")
-            lines.insert(model_config_idx, indent + field_line)
-            if model_config_idx + 1 < len(lines) and lines[model_config_idx + 1].strip() != "":
-                lines.insert(model_config_idx + 1, "")
-        if is_list:
-            lines = self.editor.ensure_import(lines, "from typing import List, Optional")
-        else:
-            lines = self.editor.ensure_import(lines, "from typing import Optional")
-        lines = self.editor.ensure_import(lines, "from pydantic import Field")
-        lines = self._update_dto_examples(lines, entity_name, related_entity, is_list, dto_type=dto_suffix.strip("_"))
-        self.editor.write_lines(dto_path, lines)
+            new_block = [indent + field_line]
+            if lines[model_config_idx].strip() != "":
+                new_block.append("")
+            splices.append((model_config_idx, new_block))
+        # Imports faltantes tras el último import, como CodeEditor.ensure_import
+        missing = [statement for statement in imports if statement not in index.present_imports]
+        last_import = index.last_import_idx
+        if last_import >= 0:
+            splices.append((last_import + 1, missing))
+        # De atrás hacia delante, así ningún índice pendiente se desplaza
+        for position, block in sorted(splices, key=lambda splice: splice[0], reverse=True):
+            lines[position:position] = block
+        if last_import < 0:
+            for statement in missing:
+                lines = self.editor.ensure_import(lines, statement)
+        lines = self._update_dto_examples(lines, entity_name, related_entity, is_list, dto_type=f"{kind}_dto")
+        self._write(dto_path, lines)
+
+    def _scan_dto(self, lines: List[str], imports: Tuple[str, ...]) -> DtoIndex:
+        """Una sola pasada: campos declarados, línea de model_config, último import e imports presentes."""
+        fields: Set[str] = set()
+        model_config_idx = -1
+        last_import_idx = -1
+        present_imports: Set[str] = set()
+        for i, line in enumerate(lines):
+            match = _DTO_FIELD_RE.match(line)
+            if match:
+                fields.add(match.group(1))
+            if model_config_idx == -1 and "model_config" in line and "=" in line:
+                model_config_idx = i
+            if line.startswith(("import ", "from ")):
+                last_import_idx = i
+            for statement in imports:
+                if statement in line:
+                    present_imports.add(statement)
+        return DtoIndex(fields, model_config_idx, last_import_idx, present_imports)
 
     def _update_dto_examples(self, lines: List[str], entity_name: str, related_entity: str, is_list: bool, dto_type: str) -> List[str]:
-        model_config_idx = next((i for i, line in enumerate(lines) if "model_config = {" in line), -1)
-        if model_config_idx == -1:
+        block = self._find_example_block(lines)
+        if block is None:
             return lines
-        json_extra_start = next((i for i in range(model_config_idx, len(lines)) if '"json_schema_extra"' in lines[i]), -1)
-        if json_extra_start == -1:
-            return lines
-        example_start = next((i for i in range(json_extra_start, len(lines)) if '"example"' in lines[i]), -1)
-        if example_start == -1:
-            return lines
-        example_dict_start = next((i+1 for i in range(example_start, min(example_start+5, len(lines))) if "{" in lines[i]), example_start+1)
-        brace_count = 0
-        example_end = example_dict_start
-        for i in range(example_dict_start-1, len(lines)):
-            brace_count += lines[i].count('{') - lines[i].count('}')
-            if brace_count <= 0 and i >= example_dict_start:
-                example_end = i
-                break
+        example_dict_start, example_end, example_body = block
         field_name = f"{related_entity}_ids" if is_list else f"{related_entity}_id"
-        if any(f'"{field_name}"' in line or f"'{field_name}'" in line for line in lines[example_dict_start:example_end]):
+        if f'"{field_name}"' in example_body or f"'{field_name}'" in example_body:
             return lines
         current_indent = 8
         if example_dict_start < len(lines) and lines[example_dict_start].strip():
@@ -437,46 +743,104 @@ class RelationManager:
             lines[example_end - 1] += ","
         return lines
 
+    def _find_example_block(self, lines: List[str]) -> Optional[Tuple[int, int, str]]:
+        """
+        Localiza el dict "example" de model_config.
+
+        Returns:
+            (primera línea del dict, línea de la llave de cierre, texto del dict) o None
+        """
+        text = "\n".join(lines)
+        match = _EXAMPLE_BLOCK_RE.search(text)
+        if match:
+            body = match.group("body")
+            start = text.count("\n", 0, match.start("body"))
+            # body termina en el salto de línea previo a la llave de cierre
+            return start, start + body.count("\n"), body[:-1]
+        # Ejemplos con dicts anidados o llaves en la misma línea: recorrido con conteo de llaves
+        return self._walk_example_block(lines)
+
+    def _walk_example_block(self, lines: List[str]) -> Optional[Tuple[int, int, str]]:
+        model_config_idx = next((i for i, line in enumerate(lines) if "model_config = {" in line), -1)
+        if model_config_idx == -1:
+            return None
+        json_extra_start = next((i for i in range(model_config_idx, len(lines)) if '"json_schema_extra"' in lines[i]), -1)
+        if json_extra_start == -1:
+            return None
+        example_start = next((i for i in range(json_extra_start, len(lines)) if '"example"' in lines[i]), -1)
+        if example_start == -1:
+            return None
+        braces = self._match_example_braces(lines, model_config_idx, json_extra_start)
+        if braces is not None:
+            open_line, close_line = braces
+            if close_line == open_line:
+                # "example": {...} en una sola línea: no hay dónde insertar el campo
+                return None
+            example_dict_start, example_end = open_line + 1, close_line
+        else:
+            # No se pudo tokenizar (código incompleto): conteo de llaves por línea
+            example_dict_start = next((i+1 for i in range(example_start, min(example_start+5, len(lines))) if "{" in lines[i]), example_start+1)
+            brace_count = 0
+            example_end = example_dict_start
+            for i in range(example_dict_start-1, len(lines)):
+                brace_count += lines[i].count('{') - lines[i].count('}')
+                if brace_count <= 0 and i >= example_dict_start:
+                    example_end = i
+                    break
+        return example_dict_start, example_end, "\n".join(lines[example_dict_start:example_end])
+
+    def _match_example_braces(self, lines: List[str], model_config_idx: int, json_extra_start: int) -> Optional[Tuple[int, int]]:
+        """
+        Líneas de la llave de apertura y de cierre del dict "example", usando tokenize.
+
+        A diferencia de contar caracteres, ignora las llaves dentro de strings.
+        Devuelve None si el código no se puede tokenizar o no aparece el dict.
+        """
+        source = "\n".join(lines[model_config_idx:]) + "\n"
+        seen_example = False
+        open_line = None
+        depth = 0
+        try:
+            for tok in tokenize.generate_tokens(io.StringIO(source).readline):
+                line_idx = model_config_idx + tok.start[0] - 1
+                if open_line is None:
+                    if tok.type == tokenize.STRING and tok.string in ('"example"', "'example'") and line_idx >= json_extra_start:
+                        seen_example = True
+                    elif seen_example and tok.type == tokenize.OP and tok.string == "{":
+                        open_line = line_idx
+                        depth = 1
+                elif tok.type == tokenize.OP and tok.string in ("{", "}"):
+                    depth += 1 if tok.string == "{" else -1
+                    if depth == 0:
+                        return open_line, line_idx
+        except (tokenize.TokenError, SyntaxError):
+            pass
+        return None
+
     # --- Servicios y Repositorios ---
     def _update_services_for_relationship(self, config: RelationshipConfig):
-        if config.relation_type == RelationType.ONE_TO_MANY:
-            self._update_service_for_foreign_key_relationship(config)
-            # Inject mapping logic for the "One" side (list of IDs)
-            if config.is_list_in_origin:
-                 self._update_service_model_to_dto(config.origin_entity, config.target_entity, is_list=True)
-            # Actualizar métodos update
-            self._update_service_update_method(config.origin_entity, config)
-            self._update_service_update_method(config.target_entity, config)
-
-        elif config.relation_type == RelationType.MANY_TO_MANY:
-            self._update_service_for_many_to_many(config)
-            # Inject mapping logic for both sides (list of IDs)
-            self._update_service_model_to_dto(config.origin_entity, config.target_entity, is_list=True)
-            self._update_service_model_to_dto(config.target_entity, config.origin_entity, is_list=True)
-            # Actualizar métodos update
-            self._update_service_update_method(config.origin_entity, config)
-            self._update_service_update_method(config.target_entity, config)
+        entities = (config.origin_entity, config.target_entity)
+        if not any(self._exists(self._paths_for(e).service) for e in entities):
+            # Sin servicios generados solo queda el repositorio de la foreign key
+            if config.relation_type == RelationType.ONE_TO_MANY:
+                self._update_repository_for_fk(config.target_entity, config.origin_entity)
+            return
 
-        elif config.relation_type == RelationType.ONE_TO_ONE:
-            self._update_service_for_one_to_one(config)
-            # Inject mapping logic only for the inverse side
-            if config.foreign_key_in_target:
-                 self._update_service_model_to_dto(config.origin_entity, config.target_entity, is_list=False)
-            else:
-                 self._update_service_model_to_dto(config.target_entity, config.origin_entity, is_list=False)
-            # Actualizar métodos update
-            self._update_service_update_method(config.origin_entity, config)
-            self._update_service_update_method(config.target_entity, config)
+        _SERVICE_UPDATERS[config.relation_type](self, config)
+
+        # Actualizar métodos update (igual para los tres tipos de relación)
+        for entity_name in entities:
+            self._update_service_update_method(entity_name, config)
 
     def _update_service_update_method(self, entity_name: str, config: RelationshipConfig):
         """
         Actualiza o crea el método update_{entity_name} en el servicio.
         """
-        service_path = self.base_path / entity_name / f"{entity_name}_service.py"
-        if not service_path.exists():
+        service_path = self._paths_for(entity_name).service
+        if not self._exists(service_path):
             return
     
-        lines = self.editor.read_lines(service_path)
+        lines = self._read(service_path)
         
         # Determinar el tipo de relación para esta entidad
         is_many_to_many = config.relation_type == RelationType.MANY_TO_MANY
@@ -493,10 +857,10 @@ class RelationManager:
         
         # Generar el método update apropiado
         if has_list_in_dto:
-            update_method = get_update_method_with_many_to_many_relations(entity_name, related_entity)
+            update_method = _update_m2m_tpl(entity_name, related_entity)
         else:
             # Para relaciones one-to-many o one-to-one, usar el método simple
-            update_method = get_update_method_with_foreign_key(entity_name, 
+            update_method = _update_fk_tpl(entity_name, 
                 config.target_entity if entity_name == config.origin_entity else config.origin_entity)
         
         # Buscar el método update existente
@@ -539,9 +903,8 @@ class RelationManager:
                 
                 # Añadir línea en blanco antes si es necesario
                 if insert_pos < len(lines) and lines[insert_pos].strip() != "":
-                    lines.insert(insert_pos, "")
-                    insert_pos += 1
-                
+                    indented_lines.insert(0, "")
+
                 lines[insert_pos:insert_pos] = indented_lines
         else:
             # Reemplazar el método existente
@@ -582,53 +945,40 @@ class RelationManager:
                         insert_idx += 1
                     lines.insert(insert_idx, "    logger = logging.getLogger(__name__)\n")
         
-        self.editor.write_lines(service_path, lines)
+        self._write(service_path, lines)
 
     def _update_service_model_to_dto(self, entity_name: str, related_entity: str, is_list: bool):
         """Inyecta la lógica de mapeo en el método model_to_dto del servicio."""
-        service_path = self.base_path / entity_name / f"{entity_name}_service.py"
-        if not service_path.exists():
+        service_path = self._paths_for(entity_name).service
+        if not self._exists(service_path):
             return
         
-        lines = self.editor.read_lines(service_path)
+        lines = self._read(service_path)
         
         # Verificar si la lógica ya existe para no duplicar
         check_str = f'dto_dict["{related_entity}_ids"]' if is_list else f'dto_dict["{related_entity}_id"]'
-        if any(check_str in line for line in lines):
+        if self._contains(service_path, check_str):
             return
 
-        # Buscar el método model_to_dto
-        start_idx = -1
-        for i, line in enumerate(lines):
-            if "def model_to_dto" in line:
-                start_idx = i
-                break
-        
-        if start_idx == -1:
+        # Buscar el método model_to_dto y, desde la línea siguiente, el return OutDto.
+        # Ambas búsquedas corren sobre el texto ya unido de la caché
+        text = self._text(service_path)
+        start_pos = text.find("def model_to_dto")
+        if start_pos == -1:
             return
+        body_pos = text.find("\n", start_pos) + 1
+        match = _OUT_DTO_RETURN_RE.search(text, body_pos) if body_pos else None
 
-        # Buscar el punto de inserción (antes del return OutDto)
-        insert_idx = -1
-        for i in range(start_idx + 1, len(lines)):
-            if "return " in lines[i] and "OutDto" in lines[i]:
-                 insert_idx = i
-                 break
-        
-        if insert_idx == -1:
+        if match is None:
             # Fallback: insertar al final del método si no encontramos el return esperado
             # (difícil saber indentación sin return, asumimos el final del bloque)
             return
 
-        # Generar e insertar lógica
-        logic_code = get_model_to_dto_logic(related_entity, is_list)
-        # La lógica ya viene indentada con 8 espacios en el template, ajustamos si es necesario.
-        # Asumimos que el código usa 4 espacios de indentación estándar.
-        
-        new_lines_logic = logic_code.split('\n')
-        # Filtramos líneas vacías extra si el template las tiene
-        lines[insert_idx:insert_idx] = [l for l in new_lines_logic if l.strip() != ""]
+        # Insertar la lógica (asume la indentación estándar de 4 espacios del servicio)
+        insert_idx = text.count("\n", 0, match.start())
+        lines[insert_idx:insert_idx] = _model_to_dto_lines(related_entity, is_list)
         
-        self.editor.write_lines(service_path, lines)
+        self._write(service_path, lines)
 
     def _update_service_for_foreign_key_relationship(self, config: RelationshipConfig):
         if config.is_list_in_origin:
@@ -637,35 +987,46 @@ class RelationManager:
             self._update_service_create_method(config.target_entity, config)
         if config.relation_type == RelationType.ONE_TO_MANY:
             self._update_repository_for_fk(config.target_entity, config.origin_entity)
+        # Inject mapping logic for the "One" side (list of IDs)
+        if config.is_list_in_origin:
+            self._update_service_model_to_dto(config.origin_entity, config.target_entity, is_list=True)
 
     def _update_service_for_many_to_many(self, config: RelationshipConfig):
-        for entity_name in [config.origin_entity, config.target_entity]:
-            self._update_service_create_method(entity_name, config)
-
-            service_path = self.base_path / entity_name / f"{entity_name}_service.py"
-            if not service_path.exists():
+        pairs = ((config.origin_entity, config.target_entity), (config.target_entity, config.origin_entity))
+        for entity_name, related_entity in pairs:
+            service_path = self._paths_for(entity_name).service
+            if not self._exists(service_path):
                 continue
 
-            related_entity = config.target_entity if entity_name == config.origin_entity else config.origin_entity
-            lines = self.editor.read_lines(service_path)
-            add_method_name = f"add_{related_entity}_to_{entity_name}"
-            if not self.editor.ensure_content(lines, f"def {add_method_name}"):
+            self._update_service_create_method(entity_name, config)
+            # create_ ya dejó el archivo en caché: la comprobación y la edición no vuelven a leerlo
+            if not self._contains(service_path, f"def add_{related_entity}_to_{entity_name}"):
+                lines = self._read(service_path)
                 lines = self.editor.ensure_import(lines, f"from app.api.{related_entity}.{related_entity}_repository import {related_entity.capitalize()}Repository")
-                methods_code = get_many_to_many_service_methods(entity_name, related_entity)
+                methods_code = _m2m_tpl(entity_name, related_entity)
                 lines.append("")
                 lines.extend("    " + line for line in methods_code.split('\n') if line.strip())
-                self.editor.write_lines(service_path, lines)
+                self._write(service_path, lines)
+
+        # Inject mapping logic for both sides (list of IDs)
+        self._update_service_model_to_dto(config.origin_entity, config.target_entity, is_list=True)
+        self._update_service_model_to_dto(config.target_entity, config.origin_entity, is_list=True)
 
     def _update_service_for_one_to_one(self, config: RelationshipConfig):
         for entity_name in [config.origin_entity, config.target_entity]:
             self._update_service_create_method(entity_name, config)
+        # Inject mapping logic only for the inverse side
+        if config.foreign_key_in_target:
+            self._update_service_model_to_dto(config.origin_entity, config.target_entity, is_list=False)
+        else:
+            self._update_service_model_to_dto(config.target_entity, config.origin_entity, is_list=False)
 
     def _update_service_create_method(self, entity_name: str, config: RelationshipConfig = None):
         """
         Inserta o reemplaza el método create_{entity_name} en el servicio.
         """
-        service_path = self.base_path / entity_name / f"{entity_name}_service.py"
-        if not service_path.exists():
+        service_path = self._paths_for(entity_name).service
+        if not self._exists(service_path):
             return
 
         is_many_to_many = config is not None and config.relation_type == RelationType.MANY_TO_MANY
@@ -679,7 +1040,7 @@ class RelationManager:
                 has_list = True
                 related_entity = config.origin_entity
 
-        lines = self.editor.read_lines(service_path)
+        lines = self._read(service_path)
 
         create_method_name = f"create_{entity_name}"
         method_start = -1
@@ -689,12 +1050,12 @@ class RelationManager:
                 break
 
         if has_list and related_entity:
-            new_method = get_create_method_with_many_to_many_relations(entity_name, related_entity)
+            new_method = _create_m2m_tpl(entity_name, related_entity)
         else:
-            new_method = get_create_method_with_relation_filter(entity_name)
+            new_method = _create_tpl(entity_name)
 
         if method_start == -1:
-            class_pos, _ = self.editor.find_insert_position_in_class(service_path, f"{entity_name.capitalize()}Service")
+            class_pos, _ = self.editor.find_insert_position_in_class(service_path, f"{entity_name.capitalize()}Service", lines)
             lines = self.editor.insert_line(lines, new_method.strip(), class_pos, 4)
         else:
             method_indent = len(lines[method_start]) - len(lines[method_start].lstrip())
@@ -714,17 +1075,35 @@ class RelationManager:
                     indented_new_lines.append("")
             lines[method_start:method_end + 1] = indented_new_lines
 
-        self.editor.write_lines(service_path, lines)
+        self._write(service_path, lines)
 
     def _update_repository_for_fk(self, entity_name: str, related_entity: str):
-        repo_path = self.base_path / entity_name / f"{entity_name}_repository.py"
-        if not repo_path.exists():
+        repo_path = self._paths_for(entity_name).repo
+        if not self._exists(repo_path):
             return
-        lines = self.editor.read_lines(repo_path)
-        if not self.editor.ensure_content(lines, "def get_by_ids"):
-            get_by_ids_code = get_get_by_ids_method(related_entity)
+        lines = self._read(repo_path)
+        if not self._contains(repo_path, "def get_by_ids"):
+            get_by_ids_code = _repo_tpl(related_entity)
             lines = self.editor.insert_before(lines, get_by_ids_code, "def get_by_id", maintain_indent=False)
-            self.editor.write_lines(repo_path, lines)
+            self._write(repo_path, lines)
+
+
+# Pasos de cada tipo de relación (mismo esquema que _DIALECTS en migration_manager)
+_CONFIGURATORS = {
+    RelationType.ONE_TO_MANY: RelationManager._configure_one_to_many,
+    RelationType.MANY_TO_MANY: RelationManager._configure_many_to_many,
+    RelationType.ONE_TO_ONE: RelationManager._configure_one_to_one,
+}
+_GENERATORS = {
+    RelationType.ONE_TO_MANY: RelationManager._generate_one_to_many,
+    RelationType.MANY_TO_MANY: RelationManager._generate_many_to_many,
+    RelationType.ONE_TO_ONE: RelationManager._generate_one_to_one,
+}
+_SERVICE_UPDATERS = {
+    RelationType.ONE_TO_MANY: RelationManager._update_service_for_foreign_key_relationship,
+    RelationType.MANY_TO_MANY: RelationManager._update_service_for_many_to_many,
+    RelationType.ONE_TO_ONE: RelationManager._update_service_for_one_to_one,
+}
 
 
 def main():
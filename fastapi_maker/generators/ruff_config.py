@@ -1,21 +1,17 @@
 """
 Generador de configuración de Ruff para FastAPI Maker.
 """
+import contextlib
+import os
+import re
+import shutil
+import tempfile
 from pathlib import Path
+from typing import Optional
 import typer
 
-class RuffConfigGenerator:
-    """Genera y maneja la configuración de Ruff."""
-    
-    @staticmethod
-    def generate_ruff_config():
-        """
-        Genera una configuración básica de Ruff en pyproject.toml.
-        """
-        config_path = Path("pyproject.toml")
-        
-        # Configuración simple y funcional de Ruff
-        config_content = '''[tool.ruff]
+# Configuración simple y funcional de Ruff (estática: se codifica una sola vez al importar)
+_RUFF_CONFIG = '''[tool.ruff]
 # Mismo que Black
 line-length = 88
 indent-width = 4
@@ -59,27 +55,91 @@ known-first-party = ["app", "models", "schemas", "routers", "crud"]
 quote-style = "double"
 indent-style = "space"
 '''
-        
+_RUFF_CONFIG_BYTES = _RUFF_CONFIG.encode("utf-8")
+
+# Cabecera de cualquier tabla [tool.ruff] o [tool.ruff.*] al inicio de línea
+# (ignora comentarios y detecta configuraciones que solo definen subtablas)
+_RUFF_TABLE_RE = re.compile(rb"^[ \t]*\[tool\.ruff(?:\.[^\]]*)?\]", re.MULTILINE)
+
+# Contenido de .ruff-ignore, ya codificado
+_RUFF_IGNORE_BYTES = b'''# Archivos a ignorar por Ruff
+/alembic/versions/*
+/migrations/versions/*
+*.pyc
+__pycache__/
+'''
+
+
+def _build_pyproject(existing: Optional[bytes]) -> Optional[bytes]:
+    """
+    Calcula (sin I/O) el contenido final de pyproject.toml a partir del actual.
+    Devuelve None si ya contiene configuración de Ruff y no hay nada que escribir.
+    """
+    if existing is None:
+        return _RUFF_CONFIG_BYTES
+    if _RUFF_TABLE_RE.search(existing):
+        return None
+    return existing + b"\n\n" + _RUFF_CONFIG_BYTES
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """
+    Escribe data en path de forma atómica: un archivo temporal único en el mismo
+    directorio se vuelca a disco y luego reemplaza al destino, de modo que un
+    fallo a mitad de escritura nunca deja un pyproject.toml truncado.
+
+    Se escribe sobre el destino real de un enlace simbólico (el enlace se
+    conserva) y el archivo conserva los permisos que tenía.
+    """
+    target = path.resolve()
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if target.exists():
+            shutil.copymode(target, tmp_name)
+        else:
+            # Archivo nuevo: mismos permisos que daría open() según la umask
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_name, 0o666 & ~umask)
+        os.replace(tmp_name, target)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_name)
+        raise
+
+
+class RuffConfigGenerator:
+    """Genera y maneja la configuración de Ruff."""
+    
+    @staticmethod
+    def generate_ruff_config():
+        """
+        Genera una configuración básica de Ruff en pyproject.toml.
+        """
+        config_path = Path("pyproject.toml")
+
         try:
-            if config_path.exists():
+            # Leer contenido existente (sin parsear el TOML); None si no existe
+            try:
+                existing: Optional[bytes] = config_path.read_bytes()
+            except FileNotFoundError:
+                existing = None
+            if existing is not None:
                 typer.echo("pyproject.toml ya existe. Actualizando configuracion de Ruff...")
-                # Leer contenido existente
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    existing = f.read()
-                
-                # Verificar si ya tiene configuración de ruff
-                if "[tool.ruff]" in existing:
-                    typer.echo("Configuracion de Ruff ya existe en pyproject.toml")
-                    return
-                
-                # Agregar configuración al final
-                with open(config_path, 'a', encoding='utf-8') as f:
-                    f.write("\n\n" + config_content)
+
+            content = _build_pyproject(existing)
+            if content is None:
+                typer.echo("Configuracion de Ruff ya existe en pyproject.toml")
+                return
+
+            _write_atomic(config_path, content)
+            if existing is not None:
                 typer.echo("Configuracion de Ruff agregada a pyproject.toml")
             else:
-                # Crear nuevo archivo
-                with open(config_path, 'w', encoding='utf-8') as f:
-                    f.write(config_content)
                 typer.echo("Configuracion de Ruff creada en pyproject.toml")
             
             # Crear .ruff-ignore si no existe
@@ -97,13 +157,12 @@ indent-style = "space"
     @staticmethod
     def create_ruff_ignore_file():
         """Crea el archivo .ruff-ignore."""
-        ignore_path = Path(".ruff-ignore")
-        if not ignore_path.exists():
-            ignore_content = '''# Archivos a ignorar por Ruff
-/alembic/versions/*
-/migrations/versions/*
-*.pyc
-__pycache__/
-'''
-            with open(ignore_path, 'w', encoding='utf-8') as f:
-                f.write(ignore_content)
\ No newline at end of file
+        # O_EXCL fusiona la comprobación de existencia con la creación
+        try:
+            fd = os.open(".ruff-ignore", os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            return
+        try:
+            os.write(fd, _RUFF_IGNORE_BYTES)
+        finally:
+            os.close(fd)
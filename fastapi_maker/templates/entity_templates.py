@@ -19,6 +19,7 @@ Correcciones aplicadas:
 3. Mantiene ejemplos con valores reales sin modificar las claves.
 """
 
+from functools import lru_cache
 from typing import List, Dict
 from fastapi_maker.utils.sqlalchemy_type_map import SQLALCHEMY_TYPE_MAP
 from fastapi_maker.utils.pydantic_type_map import PYDANTIC_TYPE_MAP
@@ -97,28 +98,12 @@ def _generate_out_dto_fields(fields: List[Dict[str, str]]) -> str:
 
 
 # ============================================================================
-# FUNCIONES PRINCIPALES
+# PLANTILLAS
 # ============================================================================
+# Cuerpos fijos con marcadores para str.format_map; las llaves literales van
+# dobladas ({{ }}). Solo se rellenan los marcadores en cada llamada.
 
-# templates/entity_templates.py (versión completa y corregida)
-
-def get_main_templates(entity_name: str, fields: List[Dict[str, str]]) -> dict:
-    entity_class = entity_name.capitalize()
-    model_fields = _generate_model_fields(fields)
-
-    # Generar lista de campos obligatorios y opcionales para la descripción
-    required_fields = [f["name"] for f in fields if f["required"]]
-    optional_fields = [f["name"] for f in fields if not f["required"]]
-    required_str = ", ".join(required_fields) if required_fields else "None"
-    optional_str = ", ".join(optional_fields) if optional_fields else "None"
-
-    create_description = f"""
-**Required fields**: {required_str}
-**Optional fields**: {optional_str}
-    """.strip()
-
-    return {
-        f"{entity_name}_model.py": f'''# ORM Model for {entity_name}
+_MODEL_TMPL = '''# ORM Model for {entity_name}
 from sqlalchemy import Column, Integer, String, Text, Boolean, Date, DateTime, Float, BigInteger
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -127,14 +112,14 @@ from app.db.base_mixin import BaseMixin
 class {entity_class}(Base, BaseMixin):
     """{entity_class} model representing a {entity_name} in the database"""
     
-    __tablename__ = "{entity_name.lower()}s"
+    __tablename__ = "{entity_name_lower}s"
     
 {model_fields}
     
     # Relationships will be added here by relation manager
-''',
+'''
 
-        f"{entity_name}_repository.py": f'''# Repository for {entity_name}
+_REPOSITORY_TMPL = '''# Repository for {entity_name}
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from .{entity_name}_model import {entity_class}
@@ -175,9 +160,9 @@ class {entity_class}Repository:
             self.db.commit()
             return True
         return False
-''',
+'''
 
-        f"{entity_name}_service.py": f'''# Service for {entity_name}
+_SERVICE_TMPL = '''# Service for {entity_name}
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from .{entity_name}_model import {entity_class}
@@ -232,9 +217,9 @@ class {entity_class}Service:
     
     def delete_{entity_name}(self, id: int) -> bool:
         return self.repository.delete(id)
-''',
+'''
 
-        f"{entity_name}_router.py": f'''# Router for {entity_name}
+_ROUTER_TMPL = '''# Router for {entity_name}
 from fastapi import APIRouter, Depends, HTTPException, status, Path, Body
 from sqlalchemy.orm import Session
 from app.db.database import get_db
@@ -313,34 +298,8 @@ def delete_{entity_name}(
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="{entity_class} not found")
 '''
-    }
 
-def get_dto_templates(entity_name: str, fields: List[Dict[str, str]]) -> dict:
-    entity_class = entity_name.capitalize()
-    pydantic_imports = _get_pydantic_imports(fields)
-    create_fields = _generate_create_dto_fields(fields)
-    update_fields = _generate_update_dto_fields(fields)
-    out_fields = _generate_out_dto_fields(fields)
-
-    # Siempre necesitamos datetime por created_at/updated_at
-    time_imports = "from datetime import datetime\n"
-    if any(f["type"] == "date" for f in fields):
-        time_imports += "from datetime import date\n"
-
-    create_example = _build_example_dict(fields)
-    update_example = _build_example_dict(fields)
-
-    out_example_lines = ['"id": 1']
-    for field in fields:
-        out_example_lines.append(f'"{field["name"]}": {_get_example_value(field["type"])}')
-    out_example_lines.extend([
-        '"created_at": "2023-01-01T00:00:00"',
-        '"updated_at": "2023-01-01T00:00:00"'
-    ])
-    out_example_str = ",\n".join(f'                {line}' for line in out_example_lines)
-
-    return {
-        f"{entity_name}_in_dto.py": f'''# Input DTO for {entity_name}
+_IN_DTO_TMPL = '''# Input DTO for {entity_name}
 from pydantic import BaseModel, Field
 {pydantic_imports}
 
@@ -354,9 +313,9 @@ class Create{entity_class}Dto(BaseModel):
             }}
         }}
     }}
-''',
+'''
 
-        f"{entity_name}_update_dto.py": f'''# Update DTO for {entity_name}
+_UPDATE_DTO_TMPL = '''# Update DTO for {entity_name}
 from pydantic import BaseModel, Field
 from typing import Optional
 {pydantic_imports}
@@ -371,9 +330,9 @@ class Update{entity_class}Dto(BaseModel):
             }}
         }}
     }}
-''',
+'''
 
-        f"{entity_name}_out_dto.py": f'''# Output DTO for {entity_name}
+_OUT_DTO_TMPL = '''# Output DTO for {entity_name}
 from pydantic import BaseModel, Field
 from typing import Optional, List
 {time_imports}
@@ -391,4 +350,92 @@ class {entity_class}OutDto(BaseModel):
         }}
     }}
 '''
-    }
\ No newline at end of file
+
+_MAIN_TEMPLATES = {
+    "{entity_name}_model.py": _MODEL_TMPL,
+    "{entity_name}_repository.py": _REPOSITORY_TMPL,
+    "{entity_name}_service.py": _SERVICE_TMPL,
+    "{entity_name}_router.py": _ROUTER_TMPL,
+}
+
+_DTO_TEMPLATES = {
+    "{entity_name}_in_dto.py": _IN_DTO_TMPL,
+    "{entity_name}_update_dto.py": _UPDATE_DTO_TMPL,
+    "{entity_name}_out_dto.py": _OUT_DTO_TMPL,
+}
+
+
+@lru_cache(maxsize=None)
+def _entity_ctx(entity_name: str) -> Dict[str, str]:
+    """Valores derivados del nombre, calculados una vez por entidad (no mutar)."""
+    return {
+        "entity_name": entity_name,
+        "entity_class": entity_name.capitalize(),
+        "entity_name_lower": entity_name.lower(),
+    }
+
+
+def _render(templates: Dict[str, str], ctx: Dict[str, str]) -> Dict[str, str]:
+    return {filename.format_map(ctx): template.format_map(ctx) for filename, template in templates.items()}
+
+
+# ============================================================================
+# FUNCIONES PRINCIPALES
+# ============================================================================
+
+# templates/entity_templates.py (versión completa y corregida)
+
+def get_main_templates(entity_name: str, fields: List[Dict[str, str]]) -> dict:
+    model_fields = _generate_model_fields(fields)
+
+    # Generar lista de campos obligatorios y opcionales para la descripción
+    required_fields = [f["name"] for f in fields if f["required"]]
+    optional_fields = [f["name"] for f in fields if not f["required"]]
+    required_str = ", ".join(required_fields) if required_fields else "None"
+    optional_str = ", ".join(optional_fields) if optional_fields else "None"
+
+    create_description = f"""
+**Required fields**: {required_str}
+**Optional fields**: {optional_str}
+    """.strip()
+
+    return _render(_MAIN_TEMPLATES, {
+        **_entity_ctx(entity_name),
+        "model_fields": model_fields,
+        "create_description": create_description,
+    })
+
+def get_dto_templates(entity_name: str, fields: List[Dict[str, str]]) -> dict:
+    pydantic_imports = _get_pydantic_imports(fields)
+    create_fields = _generate_create_dto_fields(fields)
+    update_fields = _generate_update_dto_fields(fields)
+    out_fields = _generate_out_dto_fields(fields)
+
+    # Siempre necesitamos datetime por created_at/updated_at
+    time_imports = "from datetime import datetime\n"
+    if any(f["type"] == "date" for f in fields):
+        time_imports += "from datetime import date\n"
+
+    create_example = _build_example_dict(fields)
+    update_example = _build_example_dict(fields)
+
+    out_example_lines = ['"id": 1']
+    for field in fields:
+        out_example_lines.append(f'"{field["name"]}": {_get_example_value(field["type"])}')
+    out_example_lines.extend([
+        '"created_at": "2023-01-01T00:00:00"',
+        '"updated_at": "2023-01-01T00:00:00"'
+    ])
+    out_example_str = ",\n".join(f'                {line}' for line in out_example_lines)
+
+    return _render(_DTO_TEMPLATES, {
+        **_entity_ctx(entity_name),
+        "pydantic_imports": pydantic_imports,
+        "create_fields": create_fields,
+        "update_fields": update_fields,
+        "out_fields": out_fields,
+        "time_imports": time_imports,
+        "create_example": create_example,
+        "update_example": update_example,
+        "out_example_str": out_example_str,
+    })
\ No newline at end of file
@@ -8,7 +8,21 @@
 Templates para relaciones entre entidades en FastAPI-Maker.
 """
 
-from typing import Optional, List
+from functools import lru_cache
+from typing import Optional, List, Dict
+
+
+# Contextos derivados de un nombre de entidad: capitalize() se calcula una sola
+# vez por nombre y los helpers que solo los necesitan pasan el dict tal cual a
+# format_map (no debe mutarse)
+@lru_cache(maxsize=None)
+def _entity_ctx(entity_name: str) -> Dict[str, str]:
+    return {"entity_name": entity_name, "entity_class": entity_name.capitalize()}
+
+
+@lru_cache(maxsize=None)
+def _related_ctx(related_entity: str) -> Dict[str, str]:
+    return {"related_entity": related_entity, "related_class": related_entity.capitalize()}
 
 
 def get_foreign_key_template(foreign_entity: str, unique: bool = False) -> str:
@@ -26,6 +40,9 @@ def get_relationship_template(
     uselist: Optional[bool] = None
 ) -> str:
     """Genera código para relación SQLAlchemy."""
+    # Caso habitual sin opciones: línea directa sin construir la lista de parámetros
+    if not secondary and not back_populates and uselist is None and is_list:
+        return f'{relationship_name} = relationship("{related_class}")\n'
     params = [f'"{related_class}"']
     if secondary:
         params.append(f'secondary="{secondary}"')
@@ -38,226 +55,268 @@ def get_relationship_template(
     return f'{relationship_name} = relationship({", ".join(params)})\n'
 
 
+# Las plantillas siguientes se rellenan con str.format_map; las llaves literales van dobladas ({{ }})
+_ASSOCIATION_TABLE_TMPL = (
+    '# Association table for many-to-many relationship between {entity1} and {entity2}\n'
+    'from sqlalchemy import Table, Column, Integer, ForeignKey\n'
+    'from app.db.database import Base\n'
+    '\n'
+    '{entity1}_{entity2} = Table(\n'
+    '    "{entity1}_{entity2}",\n'
+    '    Base.metadata,\n'
+    '    Column("{entity1}_id", Integer, ForeignKey("{entity1}s.id"), primary_key=True),\n'
+    '    Column("{entity2}_id", Integer, ForeignKey("{entity2}s.id"), primary_key=True)\n'
+    ')\n'
+)
+
+
 def get_association_table_template(entity1: str, entity2: str) -> str:
     """Genera código para tabla de asociación many-to-many."""
-    table_name = f"{entity1}_{entity2}"
-    return (
-        f'# Association table for many-to-many relationship between {entity1} and {entity2}\n'
-        'from sqlalchemy import Table, Column, Integer, ForeignKey\n'
-        'from app.db.database import Base\n\n'
-        f'{table_name} = Table(\n'
-        f'    "{table_name}",\n'
-        '    Base.metadata,\n'
-        f'    Column("{entity1}_id", Integer, ForeignKey("{entity1}s.id"), primary_key=True),\n'
-        f'    Column("{entity2}_id", Integer, ForeignKey("{entity2}s.id"), primary_key=True)\n'
-        ')\n'
-    )
+    return _ASSOCIATION_TABLE_TMPL.format_map({"entity1": entity1, "entity2": entity2})
+
+
+# Campo de relación indexado por is_list; idéntico en DTOs de entrada y salida
+_RELATION_FIELD_TMPL = {
+    True: '{related_entity}_ids: Optional[List[int]] = Field(None, description="Lista de IDs de {related_class}s relacionados")',
+    False: '{related_entity}_id: Optional[int] = Field(None, description="ID del {related_class} relacionado")',
+}
+
+
+def _relation_field(related_entity: str, is_list: bool) -> str:
+    return _RELATION_FIELD_TMPL[bool(is_list)].format_map(_related_ctx(related_entity))
 
 
 def get_out_dto_relation_field(related_entity: str, is_list: bool) -> str:
     """Genera campo de relación para DTOs de salida."""
-    if is_list:
-        return (
-            f'{related_entity}_ids: Optional[List[int]] = Field('
-            f'None, description="Lista de IDs de {related_entity.capitalize()}s relacionados")'
-        )
-    else:
-        return f'{related_entity}_id: Optional[int] = Field(None, description="ID del {related_entity.capitalize()} relacionado")'
+    return _relation_field(related_entity, is_list)
 
 
 def get_in_dto_relation_field(related_entity: str, is_list: bool) -> str:
     """Genera campo de relación para DTOs de entrada."""
-    if is_list:
-        return (
-            f'{related_entity}_ids: Optional[List[int]] = Field('
-            f'None, description="Lista de IDs de {related_entity.capitalize()}s relacionados")'
-        )
-    else:
-        return f'{related_entity}_id: Optional[int] = Field(None, description="ID del {related_entity.capitalize()} relacionado")'
+    return _relation_field(related_entity, is_list)
+
+
+# Lógica de model_to_dto precompuesta; solo falta sustituir {re} (entidad relacionada)
+_MODEL_TO_DTO_LIST_LOGIC = (
+    '        # Incluir IDs de {re}s\n'
+    '        if hasattr(entity, "{re}s") and entity.{re}s:\n'
+    '            {re}_ids = [item.id for item in entity.{re}s]\n'
+    '            dto_dict["{re}_ids"] = {re}_ids\n'
+    '        else:\n'
+    '            dto_dict["{re}_ids"] = []\n'
+)
+
+_MODEL_TO_DTO_SINGLE_LOGIC = (
+    '        # Incluir ID de {re}\n'
+    '        if hasattr(entity, "{re}") and entity.{re}:\n'
+    '            dto_dict["{re}_id"] = entity.{re}.id\n'
+    '        else:\n'
+    '            dto_dict["{re}_id"] = None\n'
+)
 
 
 def get_model_to_dto_logic(related_entity: str, is_list: bool) -> str:
     """Genera lógica para incluir IDs en model_to_dto."""
-    if is_list:
-        return (
-            f'        # Incluir IDs de {related_entity}s\n'
-            f'        if hasattr(entity, "{related_entity}s") and entity.{related_entity}s:\n'
-            f'            {related_entity}_ids = [item.id for item in entity.{related_entity}s]\n'
-            f'            dto_dict["{related_entity}_ids"] = {related_entity}_ids\n'
-            f'        else:\n'
-            f'            dto_dict["{related_entity}_ids"] = []\n'
-        )
-    else:
-        return (
-            f'        # Incluir ID de {related_entity}\n'
-            f'        if hasattr(entity, "{related_entity}") and entity.{related_entity}:\n'
-            f'            dto_dict["{related_entity}_id"] = entity.{related_entity}.id\n'
-            f'        else:\n'
-            f'            dto_dict["{related_entity}_id"] = None\n'
-        )
+    template = _MODEL_TO_DTO_LIST_LOGIC if is_list else _MODEL_TO_DTO_SINGLE_LOGIC
+    return template.format(re=related_entity)
+
+
+_MODEL_TO_DTO_METHOD_TMPL = (
+    '    def model_to_dto(self, entity):\n'
+    '        """Convierte un modelo a DTO, incluyendo campos básicos y relaciones."""\n'
+    '        if not entity:\n'
+    '            return None\n'
+    '        dto_dict = {{}}\n'
+    '        for column in entity.__table__.columns:\n'
+    '            dto_dict[column.name] = getattr(entity, column.name)\n'
+    '{logic}'
+    '        from .dto.{entity_name}_out_dto import {entity_class}OutDto\n'
+    '        return {entity_class}OutDto(**dto_dict)\n'
+)
 
 
 def get_model_to_dto_method(entity_name: str, related_entity: str, is_list: bool) -> str:
     """Genera método completo model_to_dto."""
-    logic = get_model_to_dto_logic(related_entity, is_list)
-    return (
-        '    def model_to_dto(self, entity):\n'
-        '        """Convierte un modelo a DTO, incluyendo campos básicos y relaciones."""\n'
-        '        if not entity:\n'
-        '            return None\n'
-        '        dto_dict = {}\n'
-        '        for column in entity.__table__.columns:\n'
-        '            dto_dict[column.name] = getattr(entity, column.name)\n'
-        f'{logic}'
-        f'        from .dto.{entity_name}_out_dto import {entity_name.capitalize()}OutDto\n'
-        f'        return {entity_name.capitalize()}OutDto(**dto_dict)\n'
-    )
+    return _MODEL_TO_DTO_METHOD_TMPL.format_map({
+        **_entity_ctx(entity_name),
+        "logic": get_model_to_dto_logic(related_entity, is_list),
+    })
+
+
+_REPOSITORY_METHOD_TMPL = (
+    '    def get_by_{related_entity}_id(self, {related_entity}_id: int):\n'
+    '        """Obtiene todos los {entity_name}s por {related_entity}_id"""\n'
+    '        return self.db.query(self.model).filter(\n'
+    '            self.model.{related_entity}_id == {related_entity}_id\n'
+    '        ).all()\n'
+)
 
 
 def get_repository_method(entity_name: str, related_entity: str) -> str:
     """Genera método para repositorio."""
-    return (
-        f'    def get_by_{related_entity}_id(self, {related_entity}_id: int):\n'
-        f'        """Obtiene todos los {entity_name}s por {related_entity}_id"""\n'
-        f'        return self.db.query(self.model).filter(\n'
-        f'            self.model.{related_entity}_id == {related_entity}_id\n'
-        f'        ).all()\n'
-    )
+    return _REPOSITORY_METHOD_TMPL.format_map({"entity_name": entity_name, "related_entity": related_entity})
+
+
+_GET_BY_IDS_METHOD_TMPL = (
+    '    def get_by_ids(self, ids: List[int]):\n'
+    '        """Obtiene múltiples {related_entity}s por lista de IDs."""\n'
+    '        return self.db.query(self.model).filter(self.model.id.in_(ids)).all()\n'
+)
 
 
 def get_get_by_ids_method(related_entity: str) -> str:
     """Genera método get_by_ids para repositorio."""
-    return (
-        '    def get_by_ids(self, ids: List[int]):\n'
-        f'        """Obtiene múltiples {related_entity}s por lista de IDs."""\n'
-        f'        return self.db.query(self.model).filter(self.model.id.in_(ids)).all()\n'
-    )
+    return _GET_BY_IDS_METHOD_TMPL.format_map({"related_entity": related_entity})
+
+
+_CREATE_METHOD_TMPL = (
+    '    def create_{entity_name}(self, {entity_name}_in_dto: Create{entity_class}Dto) -> {entity_class}OutDto:\n'
+    '        """Crea una nueva {entity_name}. Filtra automáticamente listas de relaciones."""\n'
+    '        data = {entity_name}_in_dto.model_dump()\n'
+    '        # Filtrar listas de relaciones (_ids) pero MANTENER foreign keys (_id)\n'
+    '        base_data = {{k: v for k, v in data.items() if not k.endswith("_ids")}}\n'
+    '        entity = self.repository.create(base_data)\n'
+    '        return self.model_to_dto(entity)\n'
+)
 
 
 def get_create_method_with_relation_filter(entity_name: str) -> str:
     """Genera un método create_* que filtra listas (_ids) pero mantiene FKs (_id)."""
-    return (
-        f'    def create_{entity_name}(self, {entity_name}_in_dto: Create{entity_name.capitalize()}Dto) -> {entity_name.capitalize()}OutDto:\n'
-        f'        """Crea una nueva {entity_name}. Filtra automáticamente listas de relaciones."""\n'
-        f'        data = {entity_name}_in_dto.model_dump()\n'
-        f'        # Filtrar listas de relaciones (_ids) pero MANTENER foreign keys (_id)\n'
-        f'        base_data = {{k: v for k, v in data.items() if not k.endswith("_ids")}}\n'
-        f'        entity = self.repository.create(base_data)\n'
-        f'        return self.model_to_dto(entity)\n'
-    )
+    return _CREATE_METHOD_TMPL.format_map(_entity_ctx(entity_name))
+
+
+_CREATE_M2M_METHOD_TMPL = (
+    '    def create_{entity_name}(self, {entity_name}_in_dto: Create{entity_class}Dto) -> {entity_class}OutDto:\n'
+    '        """Crea una nueva {entity_name} con manejo de relaciones many-to-many."""\n'
+    '        data = {entity_name}_in_dto.model_dump()\n'
+    '\n'
+    '        # Separar datos base de relaciones (listas)\n'
+    '        base_data = {{k: v for k, v in data.items() if not k.endswith("_ids")}}\n'
+    '        relation_ids = {{k: v for k, v in data.items() if k.endswith("_ids")}}\n'
+    '\n'
+    '        # Crear entidad base\n'
+    '        entity = self.repository.create(base_data)\n'
+    '\n'
+    '        # Manejar relaciones many-to-many si existen\n'
+    '        if relation_ids:\n'
+    '            for rel_field, ids in relation_ids.items():\n'
+    '                if ids is not None:\n'
+    '                    rel_name = rel_field[:-4]  # quitar "_ids"\n'
+    '                    for rel_id in ids:\n'
+    '                        add_method = getattr(self, f"add_{{rel_name}}_to_{entity_name}", None)\n'
+    '                        if add_method:\n'
+    '                            try:\n'
+    '                                add_method(entity.id, rel_id)\n'
+    '                            except Exception:\n'
+    '                                pass\n'
+    '\n'
+    '        return self.model_to_dto(entity)\n'
+)
 
 
 def get_create_method_with_many_to_many_relations(entity_name: str, related_entity: str) -> str:
     """Genera un método create_* que maneja relaciones m-n."""
-    return (
-        f'    def create_{entity_name}(self, {entity_name}_in_dto: Create{entity_name.capitalize()}Dto) -> {entity_name.capitalize()}OutDto:\n'
-        f'        """Crea una nueva {entity_name} con manejo de relaciones many-to-many."""\n'
-        f'        data = {entity_name}_in_dto.model_dump()\n\n'
-        f'        # Separar datos base de relaciones (listas)\n'
-        f'        base_data = {{k: v for k, v in data.items() if not k.endswith("_ids")}}\n'
-        f'        relation_ids = {{k: v for k, v in data.items() if k.endswith("_ids")}}\n\n'
-        f'        # Crear entidad base\n'
-        f'        entity = self.repository.create(base_data)\n\n'
-        f'        # Manejar relaciones many-to-many si existen\n'
-        f'        if relation_ids:\n'
-        f'            for rel_field, ids in relation_ids.items():\n'
-        f'                if ids is not None:\n'
-        f'                    rel_name = rel_field[:-4]  # quitar "_ids"\n'
-        f'                    for rel_id in ids:\n'
-        f'                        add_method = getattr(self, f"add_{{rel_name}}_to_{entity_name}", None)\n'
-        f'                        if add_method:\n'
-        f'                            try:\n'
-        f'                                add_method(entity.id, rel_id)\n'
-        f'                            except Exception:\n'
-        f'                                pass\n\n'
-        f'        return self.model_to_dto(entity)\n'
-    )
+    return _CREATE_M2M_METHOD_TMPL.format_map(_entity_ctx(entity_name))
+
+
+_M2M_SERVICE_METHODS_TMPL = (
+    'def add_{related_entity}_to_{entity_name}(self, {entity_name}_id: int, {related_entity}_id: int) -> bool:\n'
+    '    """Agrega una relación many-to-many entre {entity_name} y {related_entity}"""\n'
+    '    {entity_name}_obj = self.repository.get_by_id({entity_name}_id)\n'
+    '    {related_entity}_repo = {related_class}Repository(self.repository.db)\n'
+    '    {related_entity}_obj = {related_entity}_repo.get_by_id({related_entity}_id)\n'
+    '    if {entity_name}_obj and {related_entity}_obj:\n'
+    '        if {related_entity}_obj not in {entity_name}_obj.{related_entity}s:\n'
+    '            {entity_name}_obj.{related_entity}s.append({related_entity}_obj)\n'
+    '            self.repository.db.commit()\n'
+    '            return True\n'
+    '    return False\n'
+    '\n'
+    'def remove_{related_entity}_from_{entity_name}(self, {entity_name}_id: int, {related_entity}_id: int) -> bool:\n'
+    '    """Elimina una relación many-to-many entre {entity_name} y {related_entity}"""\n'
+    '    {entity_name}_obj = self.repository.get_by_id({entity_name}_id)\n'
+    '    if {entity_name}_obj:\n'
+    '        {entity_name}_obj.{related_entity}s = [r for r in {entity_name}_obj.{related_entity}s if r.id != {related_entity}_id]\n'
+    '        self.repository.db.commit()\n'
+    '        return True\n'
+    '    return False\n'
+)
 
 
 def get_many_to_many_service_methods(entity_name: str, related_entity: str) -> str:
     """Genera métodos para servicios many-to-many."""
-    return (
-        f'def add_{related_entity}_to_{entity_name}(self, {entity_name}_id: int, {related_entity}_id: int) -> bool:\n'
-        f'    """Agrega una relación many-to-many entre {entity_name} y {related_entity}"""\n'
-        f'    {entity_name}_obj = self.repository.get_by_id({entity_name}_id)\n'
-        f'    {related_entity}_repo = {related_entity.capitalize()}Repository(self.repository.db)\n'
-        f'    {related_entity}_obj = {related_entity}_repo.get_by_id({related_entity}_id)\n'
-        f'    if {entity_name}_obj and {related_entity}_obj:\n'
-        f'        if {related_entity}_obj not in {entity_name}_obj.{related_entity}s:\n'
-        f'            {entity_name}_obj.{related_entity}s.append({related_entity}_obj)\n'
-        f'            self.repository.db.commit()\n'
-        f'            return True\n'
-        f'    return False\n\n'
-        f'def remove_{related_entity}_from_{entity_name}(self, {entity_name}_id: int, {related_entity}_id: int) -> bool:\n'
-        f'    """Elimina una relación many-to-many entre {entity_name} y {related_entity}"""\n'
-        f'    {entity_name}_obj = self.repository.get_by_id({entity_name}_id)\n'
-        f'    if {entity_name}_obj:\n'
-        f'        {entity_name}_obj.{related_entity}s = [r for r in {entity_name}_obj.{related_entity}s if r.id != {related_entity}_id]\n'
-        f'        self.repository.db.commit()\n'
-        f'        return True\n'
-        f'    return False\n'
-    )
+    return _M2M_SERVICE_METHODS_TMPL.format_map({**_entity_ctx(entity_name), **_related_ctx(related_entity)})
+
+_UPDATE_M2M_METHOD_TMPL = (
+    '    def update_{entity_name}(self, {entity_name}_id: int, {entity_name}_update_dto: Update{entity_class}Dto) -> {entity_class}OutDto:\n'
+    '        """Actualiza una {entity_name} existente con manejo de relaciones many-to-many."""\n'
+    '        # Obtener la entidad actual\n'
+    '        entity = self.repository.get_by_id({entity_name}_id)\n'
+    '        if not entity:\n'
+    '            raise ValueError("{entity_class} no encontrada")\n'
+    '\n'
+    '        data = {entity_name}_update_dto.model_dump(exclude_unset=True)\n'
+    '\n'
+    '        # Separar datos base de relaciones (listas)\n'
+    '        base_data = {{k: v for k, v in data.items() if not k.endswith("_ids")}}\n'
+    '        relation_ids = {{k: v for k, v in data.items() if k.endswith("_ids")}}\n'
+    '\n'
+    '        # Actualizar campos base\n'
+    '        if base_data:\n'
+    '            entity = self.repository.update({entity_name}_id, base_data)\n'
+    '\n'
+    '        # Manejar relaciones many-to-many si se proporcionan\n'
+    '        for rel_field, new_ids in relation_ids.items():\n'
+    '            if new_ids is not None:\n'
+    '                rel_name = rel_field[:-4]  # quitar "_ids"\n'
+    '                \n'
+    '                # Obtener IDs actuales\n'
+    '                current_ids = [obj.id for obj in getattr(entity, f"{{rel_name}}s", [])]\n'
+    '                \n'
+    '                # Encontrar IDs a agregar y eliminar\n'
+    '                ids_to_add = [id for id in new_ids if id not in current_ids]\n'
+    '                ids_to_remove = [id for id in current_ids if id not in new_ids]\n'
+    '                \n'
+    '                # Agregar nuevas relaciones\n'
+    '                for rel_id in ids_to_add:\n'
+    '                    add_method = getattr(self, f"add_{{rel_name}}_to_{entity_name}", None)\n'
+    '                    if add_method:\n'
+    '                        try:\n'
+    '                            add_method({entity_name}_id, rel_id)\n'
+    '                        except Exception as e:\n'
+    '                            self.logger.warning(f"No se pudo agregar relación {{rel_name}} {{rel_id}}: {{e}}")\n'
+    '                \n'
+    '                # Eliminar relaciones antiguas\n'
+    '                for rel_id in ids_to_remove:\n'
+    '                    remove_method = getattr(self, f"remove_{{rel_name}}_from_{entity_name}", None)\n'
+    '                    if remove_method:\n'
+    '                        try:\n'
+    '                            remove_method({entity_name}_id, rel_id)\n'
+    '                        except Exception as e:\n'
+    '                            self.logger.warning(f"No se pudo eliminar relación {{rel_name}} {{rel_id}}: {{e}}")\n'
+    '        \n'
+    '        # Refrescar y retornar\n'
+    '        self.repository.db.refresh(entity)\n'
+    '        return self.model_to_dto(entity)\n'
+)
+
 
 def get_update_method_with_many_to_many_relations(entity_name: str, related_entity: str) -> str:
     """Genera un método update_* que maneja relaciones m-n."""
-    return (
-        f'    def update_{entity_name}(self, {entity_name}_id: int, {entity_name}_update_dto: Update{entity_name.capitalize()}Dto) -> {entity_name.capitalize()}OutDto:\n'
-        f'        """Actualiza una {entity_name} existente con manejo de relaciones many-to-many."""\n'
-        f'        # Obtener la entidad actual\n'
-        f'        entity = self.repository.get_by_id({entity_name}_id)\n'
-        f'        if not entity:\n'
-        f'            raise ValueError("{entity_name.capitalize()} no encontrada")\n\n'
-        f'        data = {entity_name}_update_dto.model_dump(exclude_unset=True)\n\n'
-        f'        # Separar datos base de relaciones (listas)\n'
-        f'        base_data = {{k: v for k, v in data.items() if not k.endswith("_ids")}}\n'
-        f'        relation_ids = {{k: v for k, v in data.items() if k.endswith("_ids")}}\n\n'
-        f'        # Actualizar campos base\n'
-        f'        if base_data:\n'
-        f'            entity = self.repository.update({entity_name}_id, base_data)\n\n'
-        f'        # Manejar relaciones many-to-many si se proporcionan\n'
-        f'        for rel_field, new_ids in relation_ids.items():\n'
-        f'            if new_ids is not None:\n'
-        f'                rel_name = rel_field[:-4]  # quitar "_ids"\n'
-        f'                \n'
-        f'                # Obtener IDs actuales\n'
-        f'                current_ids = [obj.id for obj in getattr(entity, f"{{rel_name}}s", [])]\n'
-        f'                \n'
-        f'                # Encontrar IDs a agregar y eliminar\n'
-        f'                ids_to_add = [id for id in new_ids if id not in current_ids]\n'
-        f'                ids_to_remove = [id for id in current_ids if id not in new_ids]\n'
-        f'                \n'
-        f'                # Agregar nuevas relaciones\n'
-        f'                for rel_id in ids_to_add:\n'
-        f'                    add_method = getattr(self, f"add_{{rel_name}}_to_{entity_name}", None)\n'
-        f'                    if add_method:\n'
-        f'                        try:\n'
-        f'                            add_method({entity_name}_id, rel_id)\n'
-        f'                        except Exception as e:\n'
-        f'                            self.logger.warning(f"No se pudo agregar relación {{rel_name}} {{rel_id}}: {{e}}")\n'
-        f'                \n'
-        f'                # Eliminar relaciones antiguas\n'
-        f'                for rel_id in ids_to_remove:\n'
-        f'                    remove_method = getattr(self, f"remove_{{rel_name}}_from_{entity_name}", None)\n'
-        f'                    if remove_method:\n'
-        f'                        try:\n'
-        f'                            remove_method({entity_name}_id, rel_id)\n'
-        f'                        except Exception as e:\n'
-        f'                            self.logger.warning(f"No se pudo eliminar relación {{rel_name}} {{rel_id}}: {{e}}")\n'
-        f'        \n'
-        f'        # Refrescar y retornar\n'
-        f'        self.repository.db.refresh(entity)\n'
-        f'        return self.model_to_dto(entity)\n'
-    )
+    return _UPDATE_M2M_METHOD_TMPL.format_map(_entity_ctx(entity_name))
+
+
+_UPDATE_FK_METHOD_TMPL = (
+    '    def update_{entity_name}(self, {entity_name}_id: int, {entity_name}_update_dto: Update{entity_class}Dto) -> {entity_class}OutDto:\n'
+    '        """Actualiza una {entity_name} existente con manejo de foreign keys."""\n'
+    '        data = {entity_name}_update_dto.model_dump(exclude_unset=True)\n'
+    '        # Mantener foreign key (_id) pero filtrar listas (_ids)\n'
+    '        update_data = {{k: v for k, v in data.items() if not k.endswith("_ids")}}\n'
+    '        entity = self.repository.update({entity_name}_id, update_data)\n'
+    '        return self.model_to_dto(entity)\n'
+)
 
 
 def get_update_method_with_foreign_key(entity_name: str, related_entity: str) -> str:
     """Genera un método update_* que maneja foreign keys."""
-    return (
-        f'    def update_{entity_name}(self, {entity_name}_id: int, {entity_name}_update_dto: Update{entity_name.capitalize()}Dto) -> {entity_name.capitalize()}OutDto:\n'
-        f'        """Actualiza una {entity_name} existente con manejo de foreign keys."""\n'
-        f'        data = {entity_name}_update_dto.model_dump(exclude_unset=True)\n'
-        f'        # Mantener foreign key (_id) pero filtrar listas (_ids)\n'
-        f'        update_data = {{k: v for k, v in data.items() if not k.endswith("_ids")}}\n'
-        f'        entity = self.repository.update({entity_name}_id, update_data)\n'
-        f'        return self.model_to_dto(entity)\n'
-    )
\ No newline at end of file
+    return _UPDATE_FK_METHOD_TMPL.format_map(_entity_ctx(entity_name))
@@ -6,7 +6,7 @@
 # ---------------------------------------------------
 
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 from .line_locator import LineLocator
 
 class CodeEditor:
@@ -20,6 +20,12 @@ class CodeEditor:
         """Lee un archivo y retorna sus líneas."""
         return file_path.read_text(encoding=self.encoding).splitlines()
     
+    def iter_lines(self, file_path: Path) -> Iterator[str]:
+        """Recorre las líneas de un archivo sin cargarlo entero (sin el salto de línea final)."""
+        with open(file_path, encoding=self.encoding) as f:
+            for line in f:
+                yield line.rstrip("\r\n")
+    
     ### TODO REVISAR QUE SE INSERTE UN SALTO DE LINEA AL FINAL
     def write_lines(self, file_path: Path, lines: List[str]):
         """Escribe líneas en un archivo con newline al final."""
@@ -35,6 +41,14 @@ class CodeEditor:
         except (ValueError, FileNotFoundError):
             return None
     
+    def find_line_in_lines(self, lines: List[str], content: str,
+                           function_name: Optional[str] = None) -> Optional[Tuple[int, int]]:
+        """Como find_line, pero sobre líneas ya cargadas en memoria."""
+        try:
+            return self.locator.locate_in_lines(lines, content, function_name)
+        except ValueError:
+            return None
+    
     def insert_line(self, lines: List[str], content: str, 
                    position: Optional[int] = None, indent: int = 0) -> List[str]:
         """Inserta una línea en la posición dada con indentación."""
@@ -47,23 +61,28 @@ class CodeEditor:
             lines.insert(position, content)
         
         return lines
+
+    def insert_lines(self, lines: List[str], contents: List[str],
+                     position: Optional[int] = None, indent: int = 0) -> List[str]:
+        """Inserta varias líneas consecutivas en una sola operación, con la misma indentación."""
+        if indent > 0:
+            contents = [f'{" " * indent}{content}' for content in contents]
+
+        if position is None or position < 0 or position > len(lines):
+            lines.extend(contents)
+        else:
+            lines[position:position] = contents
+
+        return lines
     
     def insert_after(self, lines: List[str], content: str, 
                     search_content: str, function_name: Optional[str] = None) -> List[str]:
         """Inserta una línea después de encontrar search_content."""
-        # Crear archivo temporal para usar LineLocator
-        temp_file = Path("__temp__.py")
-        temp_file.write_text("\n".join(lines), encoding=self.encoding)
-        
-        try:
-            result = self.find_line(temp_file, search_content, function_name)
-            if result:
-                line_num, _ = result
-                # Insertar después de la línea encontrada
-                return self.insert_line(lines, content, line_num)
-        finally:
-            if temp_file.exists():
-                temp_file.unlink()
+        result = self.find_line_in_lines(lines, search_content, function_name)
+        if result:
+            line_num, _ = result
+            # Insertar después de la línea encontrada
+            return self.insert_line(lines, content, line_num)
         
         return self.insert_line(lines, content)
     
@@ -82,65 +101,63 @@ class CodeEditor:
         Si `ensure_blank_line=True`, se asegura de que haya una línea vacía
         inmediatamente antes de `search_content`, e inserta `content` antes de esa línea vacía.
         """
-        temp_file = Path("__temp__.py")
-        temp_file.write_text("\n".join(lines), encoding=self.encoding)
-    
-        try:
-            result = self.find_line(temp_file, search_content, function_name)
-            if result:
-                line_num, search_indent = result  # line_num es 1-indexed
-                insert_pos = line_num - 1  # posición 0-indexed de la línea con search_content
-    
-                if ensure_blank_line:
-                    # Verificar si ya hay una línea vacía justo antes
-                    if insert_pos == 0 or lines[insert_pos - 1].strip() != "":
-                        # Insertar línea vacía antes de search_content
-                        lines.insert(insert_pos, "")
-                        # Ahora el contenido debe ir antes de la línea vacía
-                        insert_pos_for_content = insert_pos
-                    else:
-                        # Ya hay una línea vacía → insertar antes de ella
-                        insert_pos_for_content = insert_pos - 1
-                else:
-                    # Comportamiento original: insertar inmediatamente antes
+        result = self.find_line_in_lines(lines, search_content, function_name)
+        if result:
+            line_num, search_indent = result  # line_num es 1-indexed
+            insert_pos = line_num - 1  # posición 0-indexed de la línea con search_content
+
+            if ensure_blank_line:
+                # Verificar si ya hay una línea vacía justo antes
+                if insert_pos == 0 or lines[insert_pos - 1].strip() != "":
+                    # Insertar línea vacía antes de search_content
+                    lines.insert(insert_pos, "")
+                    # Ahora el contenido debe ir antes de la línea vacía
                     insert_pos_for_content = insert_pos
-    
-                # Determinar indentación
-                indent = search_indent if maintain_indent else 0
-    
-                # Insertar contenido en la posición correcta
-                if indent > 0:
-                    content = f'{" " * indent}{content}'
-    
-                lines.insert(insert_pos_for_content, content)
-                return lines
-    
-        finally:
-            if temp_file.exists():
-                temp_file.unlink()
+                else:
+                    # Ya hay una línea vacía → insertar antes de ella
+                    insert_pos_for_content = insert_pos - 1
+            else:
+                # Comportamiento original: insertar inmediatamente antes
+                insert_pos_for_content = insert_pos
+
+            # Determinar indentación
+            indent = search_indent if maintain_indent else 0
+
+            # Insertar contenido en la posición correcta
+            if indent > 0:
+                content = f'{" " * indent}{content}'
+
+            lines.insert(insert_pos_for_content, content)
+            return lines
     
         # Si no se encuentra, insertar al final (comportamiento original)
         return self.insert_line(lines, content)
     
-    def find_insert_position_in_class(self, file_path: Path, class_name: str) -> Tuple[int, int]:
-        """Encuentra dónde insertar en una clase (antes del primer método o al final)."""
-        lines = self.read_lines(file_path)
+    def find_insert_position_in_class(self, file_path: Path, class_name: str,
+                                      lines: Optional[List[str]] = None) -> Tuple[int, int]:
+        """
+        Encuentra dónde insertar en una clase (antes del primer método o al final).
+        
+        Si se pasan `lines` (p. ej. con cambios aún sin escribir) se usan en lugar del archivo.
+        """
+        if lines is None:
+            lines = self.read_lines(file_path)
         
         # Buscar la clase
-        class_line = self.find_line(file_path, f"class {class_name}")
+        class_line = self.find_line_in_lines(lines, f"class {class_name}")
         if not class_line:
             return len(lines), 0  # Insertar al final sin indentación extra
         
         class_line_num, class_indent = class_line
         
         # Buscar el primer método después de la clase
-        method_line = self.find_line(file_path, "def ", class_name)
+        method_line = self.find_line_in_lines(lines, "def ", class_name)
         if method_line:
             method_line_num, method_indent = method_line
             return method_line_num - 1, method_indent  # Insertar antes del método
         
         # Buscar el cierre de la clase
-        closing_line = self.find_line(file_path, "}", class_name)
+        closing_line = self.find_line_in_lines(lines, "}", class_name)
         if closing_line:
             closing_line_num, _ = closing_line
             return closing_line_num - 1, class_indent + 4  # Insertar antes del cierre con indentación de clase
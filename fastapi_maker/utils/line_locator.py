@@ -6,7 +6,7 @@
 # ---------------------------------------------------
 
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 import re
 
 
@@ -36,6 +36,25 @@ class LineLocator:
         else:
             return self._locate_in_function(file_path, content, function_name)
     
+    def locate_in_lines(self, lines: List[str], content: str, function_name: Optional[str] = None,
+                        source: str = "<lines>") -> Tuple[int, int]:
+        """
+        Igual que `locate`, pero sobre líneas ya cargadas en memoria.
+        
+        Args:
+            lines: Líneas del archivo (sin saltos de línea)
+            content: Texto a buscar en la línea
+            function_name: Nombre de la función donde buscar (None para búsqueda global)
+            source: Nombre usado en los mensajes de error
+            
+        Returns:
+            Tupla (número_de_línea, indentación)
+        """
+        if function_name is None:
+            return self._search_global(lines, content, source)
+        else:
+            return self._search_in_function(lines, content, function_name, source)
+    
     def _locate_global(self, file_path: str, content: str) -> Tuple[int, int]:
         """
         Busca globalmente la primera línea que contenga el texto.
@@ -45,13 +64,16 @@ class LineLocator:
             raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
         
         lines = path.read_text(encoding=self.encoding).splitlines()
-        
+        return self._search_global(lines, content, file_path)
+    
+    def _search_global(self, lines: List[str], content: str, source: str) -> Tuple[int, int]:
+        """Primera línea de `lines` que contiene el texto."""
         for i, line in enumerate(lines, 1):
             if content in line:
                 indent = len(line) - len(line.lstrip())
                 return i, indent
         
-        raise ValueError(f"No se encontró '{content}' en {file_path}")
+        raise ValueError(f"No se encontró '{content}' en {source}")
     
     def _locate_in_function(self, file_path: str, content: str, function_name: str) -> Tuple[int, int]:
         """
@@ -62,7 +84,11 @@ class LineLocator:
         """
         path = Path(file_path)
         lines = path.read_text(encoding=self.encoding).splitlines()
-        
+        return self._search_in_function(lines, content, function_name, file_path)
+    
+    def _search_in_function(self, lines: List[str], content: str, function_name: str,
+                            source: str) -> Tuple[int, int]:
+        """Primera línea con el texto dentro del cuerpo de `function_name` en `lines`."""
         # 1. Localizar la función
         func_line = None
         func_indent = None
@@ -76,7 +102,7 @@ class LineLocator:
                 break
         
         if func_line is None:
-            raise ValueError(f"No se encontró la función '{function_name}' en {file_path}")
+            raise ValueError(f"No se encontró la función '{function_name}' en {source}")
         
         # 2. Buscar dentro del cuerpo de la función
         in_function = False
@@ -2,21 +2,46 @@
 Ejecutor de Ruff para FastAPI Maker.
 Maneja toda la lógica de ejecución del linter/formatter.
 """
+import os
+import shutil
 import subprocess
+import sys
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional, Tuple
 import typer
 
+# Comandos estáticos como tuplas compartidas (subprocess acepta cualquier secuencia)
+_CMD_RUFF_CHECK = ("ruff", "check")
+_CMD_RUFF_CHECK_FIX = ("ruff", "check", "--fix")
+_CMD_RUFF_FORMAT = ("ruff", "format")
+
+
+@lru_cache(maxsize=1)
+def _ruff_bin() -> Optional[str]:
+    """
+    Resuelve una sola vez por proceso la ruta del ejecutable de ruff.
+
+    Se busca el ejecutable en el PATH (es lo que invoca subprocess) en lugar de
+    importar el paquete: no ejecuta código de ruff y detecta también
+    instalaciones independientes (uv tool, pipx).
+    """
+    return shutil.which("ruff")
+
+
+@lru_cache(maxsize=None)
+def _argv(cmd: Tuple[str, ...]) -> Tuple[str, ...]:
+    """argv definitivo de un comando de ruff, con el ejecutable ya resuelto (uno por comando)."""
+    return (_ruff_bin() or "ruff", *cmd[1:])
+
+
 class RuffExecutor:
     """Ejecuta comandos de Ruff con diferentes opciones."""
     
     @staticmethod
     def check_ruff_installed():
         """Verifica si ruff está instalado."""
-        try:
-            import ruff
-            return True
-        except ImportError:
-            return False
+        return _ruff_bin() is not None
     
     @staticmethod
     def ensure_config_exists():
@@ -28,9 +53,23 @@ class RuffExecutor:
             RuffConfigGenerator.generate_ruff_config()
     
     @staticmethod
-    def run_command(cmd_parts, description):
-        """Ejecuta un comando y maneja la salida."""
+    def run_command(cmd_parts, description, exec_replace=False):
+        """
+        Ejecuta un comando y maneja la salida.
+
+        Con exec_replace=True (solo POSIX) el proceso actual se reemplaza por el
+        comando, sin fork ni cierre del intérprete; usar únicamente cuando es la
+        última acción del CLI, ya que no retorna.
+        """
         typer.echo(f" {description}: {' '.join(cmd_parts)}")
+        # El argv con la ruta ya resuelta se construye una sola vez por comando;
+        # tuple() no copia las tuplas de módulo
+        if cmd_parts[0] == "ruff":
+            cmd_parts = _argv(tuple(cmd_parts))
+        if exec_replace and os.name != "nt":
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.execvp(cmd_parts[0], cmd_parts)
         result = subprocess.run(cmd_parts)
         return result
     
@@ -41,7 +80,7 @@ class RuffExecutor:
         
         # Primero lint con fix
         lint_result = RuffExecutor.run_command(
-            ["ruff", "check", "--fix"],
+            _CMD_RUFF_CHECK_FIX,
             "Intentando arreglar problemas automáticamente"
         )
         
@@ -50,7 +89,7 @@ class RuffExecutor:
         
         # Luego format
         RuffExecutor.run_command(
-            ["ruff", "format"],
+            _CMD_RUFF_FORMAT,
             "Aplicando formato al código"
         )
         
@@ -60,24 +99,27 @@ class RuffExecutor:
     def execute_check_only():
         """Solo verifica sin cambios."""
         RuffExecutor.run_command(
-            ["ruff", "check"],
-            "Verificando código (modo check)"
+            _CMD_RUFF_CHECK,
+            "Verificando código (modo check)",
+            exec_replace=True
         )
     
     @staticmethod
     def execute_fix():
         """Intenta arreglar problemas automáticamente."""
         RuffExecutor.run_command(
-            ["ruff", "check", "--fix"],
-            "Intentando arreglar problemas automáticamente"
+            _CMD_RUFF_CHECK_FIX,
+            "Intentando arreglar problemas automáticamente",
+            exec_replace=True
         )
     
     @staticmethod
     def execute_format():
         """Aplica formato al código."""
         RuffExecutor.run_command(
-            ["ruff", "format"],
-            "Aplicando formato al código"
+            _CMD_RUFF_FORMAT,
+            "Aplicando formato al código",
+            exec_replace=True
         )
     
     @staticmethod
@@ -87,13 +129,13 @@ class RuffExecutor:
         
         # Primero lint (solo check)
         lint_result = RuffExecutor.run_command(
-            ["ruff", "check"],
+            _CMD_RUFF_CHECK,
             "Verificando código"
         )
         
         # Luego format
         format_result = RuffExecutor.run_command(
-            ["ruff", "format"],
+            _CMD_RUFF_FORMAT,
             "Aplicando formato"
         )
         